@@ -1,6 +1,7 @@
 """RGBW color model implementation"""
 
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+import numpy as np
 
 
 class RGBW(int):
@@ -117,6 +118,51 @@ class RGBW(int):
             data.get("r", 0), data.get("g", 0), data.get("b", 0), data.get("w", 0)
         )
 
+    def pack(self) -> int:
+        """Convert RGBW to a plain packed 0xWWRRGGBB integer"""
+        return int(self)
+
+    @classmethod
+    def unpack(cls, packed: int) -> "RGBW":
+        """Create RGBW from a packed 0xWWRRGGBB integer"""
+        return cls(int(packed))
+
+    @staticmethod
+    def pack_array(
+        r: np.ndarray,
+        g: np.ndarray,
+        b: np.ndarray,
+        w: Union[np.ndarray, int] = 0,
+    ) -> np.ndarray:
+        """Vectorized version of pack, for arrays of channels in range [0, 255].
+        Float channels are truncated like the int() in RGBW.from_hsv.
+        Returns:
+            np.ndarray: Packed 0xWWRRGGBB colors as uint32
+        """
+        return (
+            (np.asarray(w).astype(np.uint32) << 24)
+            | (np.asarray(r).astype(np.uint32) << 16)
+            | (np.asarray(g).astype(np.uint32) << 8)
+            | np.asarray(b).astype(np.uint32)
+        )
+
+    @staticmethod
+    def unpack_array(
+        packed: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized version of unpack, for an array of packed colors
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The r, g, b
+            and w channels as uint8 arrays
+        """
+        packed = np.asarray(packed, dtype=np.uint32)
+        return (
+            (packed >> 16).astype(np.uint8),
+            (packed >> 8).astype(np.uint8),
+            packed.astype(np.uint8),
+            (packed >> 24).astype(np.uint8),
+        )
+
     def to_list(self) -> List[int]:
         """Convert RGBW to list format [r, g, b, w]"""
         return [self.r, self.g, self.b, self.w]
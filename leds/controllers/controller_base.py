@@ -2,6 +2,7 @@ from functools import cache
 from typing import TYPE_CHECKING, Type, Any, Tuple, Callable, Union, List, Dict
 from abc import ABC, abstractmethod
 import math
+import numpy as np
 from leds.color import RGBW
 from leds.mock import MockPixelStrip
 
@@ -10,7 +11,26 @@ if TYPE_CHECKING:
 
 # Try to import the real library first
 try:
-    from rpi_ws281x import PixelStrip as RealPixelStrip  # type: ignore
+    import _rpi_ws281x as ws  # type: ignore
+    from rpi_ws281x import PixelStrip as LibraryPixelStrip  # type: ignore
+
+    class RealPixelStrip(LibraryPixelStrip):  # type: ignore
+        """rpi_ws281x strip with the bulk setter that MockPixelStrip provides"""
+
+        def setPixelColorArray(self, colors: np.ndarray) -> None:
+            # The library has no bulk setter. Call its C setter directly rather
+            # than going through setPixelColor and __setitem__ for every LED.
+            led_set = ws.ws2811_led_set
+            channel = self._channel
+            if np.ma.is_masked(colors):
+                indices = np.flatnonzero(~colors.mask)
+                for index, color in zip(
+                    indices.tolist(), colors.data[indices].tolist()
+                ):
+                    led_set(channel, index, color)
+                return
+            for index, color in enumerate(colors.tolist()):
+                led_set(channel, index, color)
 
     real_library_available = True
 except ImportError:
@@ -29,7 +49,7 @@ def get_library(mock: bool) -> Tuple[Type[Any], bool]:
     return (RealPixelStrip, True)  # type: ignore
 
 
-class ControllerBase(ABC):
+class ControllerBase(ABC):  # pylint: disable=too-many-public-methods
     def __init__(self, config: "BaseConfig", mock: bool):
         PixelStrip, is_real = get_library(mock)
         self.is_mock = not is_real
@@ -54,16 +74,7 @@ class ControllerBase(ABC):
 
     @cache  # pylint: disable=method-cache-max-size-none
     def get_max_distance(self) -> float:
-        highest = 0
-
-        def distance_callback(
-            distance: float, index: Tuple[int, int]  # pylint: disable=unused-argument
-        ) -> None:
-            nonlocal highest
-            highest = max(highest, distance)
-
-        self.map_distance(distance_callback)
-        return highest
+        return float(self.get_distance_array().max())
 
     @cache  # pylint: disable=method-cache-max-size-none
     def get_x_y_limits(self) -> Tuple[float, float, float, float]:
@@ -89,6 +100,108 @@ class ControllerBase(ABC):
         self.map_coordinates(x_callback)
         return highest_x, highest_y, lowest_x, lowest_y
 
+    @cache  # pylint: disable=method-cache-max-size-none
+    def get_coordinate_arrays(
+        self,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the x, y, panel index and LED index of every LED as arrays,
+        in the order in which map_coordinates visits them."""
+        xs: List[float] = []
+        ys: List[float] = []
+        panel_indices: List[int] = []
+        led_indices: List[int] = []
+
+        def collect_callback(x: float, y: float, index: Tuple[int, int]) -> None:
+            xs.append(x)
+            ys.append(y)
+            panel_indices.append(index[0])
+            led_indices.append(index[1])
+
+        self.map_coordinates(collect_callback)
+        return (
+            np.array(xs, dtype=np.float64),
+            np.array(ys, dtype=np.float64),
+            np.array(panel_indices, dtype=np.int64),
+            np.array(led_indices, dtype=np.int64),
+        )
+
+    @cache  # pylint: disable=method-cache-max-size-none
+    def get_framebuffer(self) -> np.ndarray:
+        """Returns an array of packed colors (see RGBW.pack) with an entry per
+        LED, in the order in which map_coordinates visits them. The same array
+        is returned every time, so effects can render into it in place and pass
+        it to set_pixels without allocating a new array every frame."""
+        return np.zeros(self.config.get_led_count(), dtype=np.uint32)
+
+    @cache  # pylint: disable=method-cache-max-size-none
+    def get_scaled_coordinate_arrays(
+        self, force_positive: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the x and y of every LED scaled like map_scaled_coordinates
+        does, in the order in which map_coordinates visits them. The arrays are
+        shared between calls, so they should not be modified."""
+        xs, ys, _, _ = self.get_coordinate_arrays()
+        return self._scale_coordinate_arrays(xs, ys, force_positive)
+
+    def _scale_coordinate_arrays(
+        self, xs: np.ndarray, ys: np.ndarray, force_positive: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        max_x, max_y, lowest_x, lowest_y = self.get_x_y_limits()
+        if force_positive:
+            return (
+                (xs - lowest_x) / (max_x - lowest_x),
+                (ys - lowest_y) / (max_y - lowest_y),
+            )
+        return xs / max_x, ys / max_y
+
+    @cache  # pylint: disable=method-cache-max-size-none
+    def get_distance_array(self) -> np.ndarray:
+        """Returns the distance of every LED from the center, in the order in
+        which map_coordinates visits them. The array is shared between calls,
+        so it should not be modified."""
+        xs, ys, _, _ = self.get_coordinate_arrays()
+        return np.hypot(xs, ys)
+
+    @cache  # pylint: disable=method-cache-max-size-none
+    def get_scaled_distance_array(self) -> np.ndarray:
+        """Like get_distance_array, but divided by the largest distance"""
+        return self.get_distance_array() * (1 / self.get_max_distance())
+
+    @staticmethod
+    def _map_cached_coordinates(
+        strips: List[MockPixelStrip],
+        cached_coordinates: List[List[Tuple[float, float, Tuple[int, int]]]],
+        callback: Callable[[float, float, Tuple[int, int]], Union[RGBW, None]],
+    ) -> None:
+        """Shared map_coordinates implementation for controllers that cache the
+        coordinates of every panel as (x, y, (panel index, LED index)) tuples,
+        where the LED index is the index on that panel's strip."""
+        for strip, panel_cache in zip(strips, cached_coordinates):
+            # The index tuples are created once in the cache and reused here
+            set_pixel_color = strip.setPixelColor
+            for absolute_x, absolute_y, indices in panel_cache:
+                color = callback(absolute_x, absolute_y, indices)
+                if color is not None:
+                    set_pixel_color(indices[1], color)
+
+    def set_pixels(self, colors: np.ndarray) -> None:
+        """Sets the color of every LED from an array of packed colors (see
+        RGBW.pack), in the order in which map_coordinates visits the LEDs.
+        LEDs that are masked out with numpy.ma are skipped, just like when a
+        map_coordinates callback returns None."""
+        colors_iter = iter(colors.tolist())
+        self.map_coordinates(lambda x, y, index: next(colors_iter))
+
+    def map_coordinates_vectorized(
+        self, callback: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    ) -> None:
+        """Like map_coordinates, but the callback receives the x and y coordinates
+        of many LEDs at once as arrays and returns an array of packed colors
+        (see RGBW.pack) of the same length. To leave LEDs unchanged, return a
+        numpy.ma masked array with those LEDs masked out."""
+        xs, ys, _, _ = self.get_coordinate_arrays()
+        self.set_pixels(callback(xs, ys))
+
     @abstractmethod
     def get_coordinates(self, strip_index: int, led_index: int) -> Tuple[float, float]:
         pass
@@ -105,10 +218,16 @@ class ControllerBase(ABC):
         def coordinate_callback(
             x: float, y: float, index: Tuple[int, int]
         ) -> Union[RGBW, None]:
-            return callback(math.sqrt(x**2 + y**2), index)
+            return callback(math.hypot(x, y), index)
 
         self.map_coordinates(coordinate_callback)
 
+    def map_distance_vectorized(
+        self, callback: Callable[[np.ndarray], np.ndarray]
+    ) -> None:
+        """Vectorized version of map_distance, see map_coordinates_vectorized"""
+        self.set_pixels(callback(self.get_distance_array()))
+
     def map_scaled_coordinates(
         self,
         callback: Callable[[float, float, Tuple[int, int]], Union[RGBW, None]],
@@ -123,6 +242,15 @@ class ControllerBase(ABC):
             )
         )
 
+    def map_scaled_coordinates_vectorized(
+        self,
+        callback: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        force_positive: bool,
+    ) -> None:
+        """Vectorized version of map_scaled_coordinates, see map_coordinates_vectorized"""
+        xs, ys = self.get_scaled_coordinate_arrays(force_positive)
+        self.set_pixels(callback(xs, ys))
+
     def map_scaled_distance(
         self, callback: Callable[[float, Tuple[int, int]], Union[RGBW, None]]
     ) -> None:
@@ -131,6 +259,12 @@ class ControllerBase(ABC):
             lambda distance, index: callback(distance / max_distance, index)
         )
 
+    def map_scaled_distance_vectorized(
+        self, callback: Callable[[np.ndarray], np.ndarray]
+    ) -> None:
+        """Vectorized version of map_scaled_distance, see map_coordinates_vectorized"""
+        self.set_pixels(callback(self.get_scaled_distance_array()))
+
     def map_angle(
         self, callback: Callable[[float, Tuple[int, int]], Union[RGBW, None]]
     ) -> None:
@@ -148,6 +282,18 @@ class ControllerBase(ABC):
 
         self.map_coordinates(coordinate_callback)
 
+    def map_angle_vectorized(
+        self, callback: Callable[[np.ndarray], np.ndarray]
+    ) -> None:
+        """Vectorized version of map_angle, see map_coordinates_vectorized"""
+
+        def coordinate_callback(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+            angles = np.arctan2(ys, xs)
+            angles[angles < 0] += 2 * np.pi
+            return callback(angles)
+
+        self.map_coordinates_vectorized(coordinate_callback)
+
     @abstractmethod
     def get_strips(self) -> List[MockPixelStrip]:
         pass
@@ -162,30 +308,48 @@ class ControllerBase(ABC):
 
     def set_color(self, color: RGBW) -> None:
         for strip in self.get_strips():
-            for i in range(strip.numPixels()):
-                strip.setPixelColor(i, color)
+            strip.setPixelColorArray(
+                np.full(strip.numPixels(), color.pack(), dtype=np.uint32)
+            )
+
+    def clear(self) -> None:
+        """Turns all LEDs off, like set_color with black but without building
+        a color array per strip"""
+        framebuffer = self.get_framebuffer()
+        framebuffer.fill(0)
+        self.set_pixels(framebuffer)
 
     def json(self) -> List[List[Dict[str, Union[int, float]]]]:
         pixels: List[List[Dict[str, Union[int, float]]]] = []
         for strip_index, strip in enumerate(self.get_strips()):
-            strip_pixels: List[Dict[str, Union[int, float]]] = []
-            for i in range(strip.numPixels()):
-                pixel = strip.getPixelColorRGBW(i)
-                pixel_data: Dict[str, Union[int, float]] = {
-                    "r": pixel.r,
-                    "g": pixel.g,
-                    "b": pixel.b,
-                    "w": pixel.w,
-                    "brightness": strip.getBrightness(),
-                }
-                if self.config.debug_positions:
+            brightness = strip.getBrightness()
+            channels = RGBW.unpack_array(np.asarray(strip.getPixels()[:]))
+            strip_pixels: List[Dict[str, Union[int, float]]] = [
+                {"r": r, "g": g, "b": b, "w": w, "brightness": brightness}
+                for r, g, b, w in zip(*(channel.tolist() for channel in channels))
+            ]
+            if self.config.debug_positions:
+                for i, pixel_data in enumerate(strip_pixels):
                     x, y = self.get_coordinates(strip_index, i)
                     pixel_data["x"] = x
                     pixel_data["y"] = y
-                strip_pixels.append(pixel_data)
             pixels.append(strip_pixels)
         return pixels
 
+    def packed_frame(self) -> np.ndarray:
+        """Binary version of json without positions, used for led_update frames.
+        All fields are little endian uint32s: the number of strips, then the
+        pixel count and brightness of every strip, then the packed colors (see
+        RGBW.pack) of all strips after each other."""
+        strips = self.get_strips()
+        header = [len(strips)]
+        for strip in strips:
+            header.extend((strip.numPixels(), strip.getBrightness()))
+        return np.concatenate(
+            [np.array(header, dtype="<u4")]
+            + [np.asarray(strip.getPixels()[:], dtype="<u4") for strip in strips]
+        )
+
     @abstractmethod
     def get_visualizer_config(self) -> Any:
         pass
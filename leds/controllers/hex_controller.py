@@ -1,7 +1,8 @@
 # pylint: disable=duplicate-code
 
-import math
+from functools import lru_cache
 from typing import Any, List, Tuple, Callable, Union, TYPE_CHECKING, Dict
+import numpy as np
 from leds.color import RGBW
 from leds.controllers.controller_base import ControllerBase
 
@@ -17,6 +18,16 @@ HEX_X_SCALE = 0.8
 HEX_Y_SCALE = 0.9
 
 
+@lru_cache(maxsize=None)
+def _get_x_y_table(total_leds: int) -> Tuple[List[float], List[float]]:
+    """X and Y offsets of every LED index in a hexagon with the given LED count.
+    Hexagons share a handful of LED counts so these only get computed once."""
+    # Same angles as HexPanel.get_angle_at_index
+    angles = np.deg2rad(((-np.arange(total_leds) / total_leds) * 360 + 510) % 360)
+    radius = HEX_SIZE * 0.9 * 0.5
+    return (radius * np.sin(angles)).tolist(), (radius * np.cos(angles)).tolist()
+
+
 class HexPanel:
     def __init__(self, panel_config: "Hexagon", strip: "MockPixelStrip"):
         self.panel_config = panel_config
@@ -56,10 +67,9 @@ class HexPanel:
         return ((-fraction * 360) + 360 + 180 - 30) % 360
 
     def get_x_y_at_index(self, index: int) -> Tuple[float, float]:
-        angle = self.get_angle_at_index(index)
-        return round((HEX_SIZE * 0.9 * 0.5) * math.sin(math.radians(angle))), round(
-            (HEX_SIZE * 0.9 * 0.5) * math.cos(math.radians(angle))
-        )
+        total_leds = len(self.panel_config.ordered_leds)
+        xs, ys = _get_x_y_table(total_leds)
+        return round(xs[index % total_leds]), round(ys[index % total_leds])
 
     def set_color(self, color: RGBW):
         for index in self.panel_config.ordered_leds:
@@ -78,15 +88,21 @@ class HexPanelLEDController(ControllerBase):
         self.panels: List[HexPanel] = [
             HexPanel(hexagon, self.strip) for hexagon in config.hexagons
         ]
+        # Panels share strips, dedupe them once by identity rather than per call
+        self._strips: List["MockPixelStrip"] = list(
+            {id(panel.strip): panel.strip for panel in self.panels}.values()
+        )
+        # Full strip of packed colors that vectorized updates are scattered into
+        self._strip_colors = np.zeros(config.get_led_count(), dtype=np.uint32)
         self.max_x = 0
         self.max_y = 0
         self.cached_coordinates: List[List[Tuple[float, float, Tuple[int, int]]]] = (
             []
         )  # Cache for pre-calculated coordinates
         for panel in self.panels:
-            for panel in self.panels:
-                self.max_x = max(self.max_x, panel.get_edges()[1])
-                self.max_y = max(self.max_y, panel.get_edges()[3])
+            _, end_x, _, end_y = panel.get_edges()
+            self.max_x = max(self.max_x, end_x)
+            self.max_y = max(self.max_y, end_y)
 
         # Pre-calculate and cache coordinates
         total_center_x = self.max_x / 2
@@ -109,24 +125,32 @@ class HexPanelLEDController(ControllerBase):
     def map_coordinates(
         self, callback: Callable[[float, float, Tuple[int, int]], Union[RGBW, None]]
     ) -> None:
-        for panel_cache in self.cached_coordinates:
-            for absolute_x, absolute_y, indices in panel_cache:
-                color = callback(absolute_x, absolute_y, indices)
-                if color is not None:
-                    panel_index, led_index = indices
-                    self.panels[panel_index].strip.setPixelColor(led_index, color)
+        self._map_cached_coordinates(
+            [panel.strip for panel in self.panels], self.cached_coordinates, callback
+        )
 
-    def get_coordinates(self, strip_index: int, led_index: int) -> Tuple[float, float]:
-        panel_index, _ = self.led_number_map[led_index]
-        for absolute_x, absolute_y, indices in self.cached_coordinates[panel_index]:
-            if indices == (panel_index, led_index):
-                return absolute_x, absolute_y
-        raise ValueError(
-            f"Coordinates not found for panel {panel_index} and led {led_index}"
+    def set_pixels(self, colors: np.ndarray) -> None:
+        _, _, _, led_numbers = self.get_coordinate_arrays()
+        self._strip_colors[led_numbers] = np.ma.getdata(colors)
+        if not np.ma.is_masked(colors):
+            self.strip.setPixelColorArray(self._strip_colors)
+            return
+        # Translate the mask to strip order so skipped LEDs keep their color
+        strip_mask = np.zeros(self._strip_colors.shape[0], dtype=bool)
+        strip_mask[led_numbers] = colors.mask
+        self.strip.setPixelColorArray(
+            np.ma.MaskedArray(self._strip_colors, mask=strip_mask)
         )
 
+    def get_coordinates(self, strip_index: int, led_index: int) -> Tuple[float, float]:
+        panel_index, panel_led_index = self.led_number_map[led_index]
+        absolute_x, absolute_y, _ = self.cached_coordinates[panel_index][
+            panel_led_index
+        ]
+        return absolute_x, absolute_y
+
     def get_strips(self) -> List["MockPixelStrip"]:
-        return list({panel.strip for panel in self.panels})
+        return self._strips
 
     def get_visualizer_config(self) -> Any:
         return {
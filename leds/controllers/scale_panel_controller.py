@@ -1,4 +1,6 @@
+from functools import cache
 from typing import Type, Any, List, Tuple, Callable, Union, TYPE_CHECKING
+import numpy as np
 from leds.color import RGBW
 from leds.mock import MockPixelStrip
 from leds.controllers.controller_base import ControllerBase
@@ -7,6 +9,22 @@ if TYPE_CHECKING:
     from config import ScaleConfig
 
 
+def build_panel_coordinates(
+    x_count: int, y_count: int, base_x: float, center_y: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Builds the x and y coordinates of the LEDs of a single panel, indexed by
+    LED index. The strip snakes through the panel: first up from the bottom left,
+    then down again through the column half a scale to the right, and so on."""
+    # Every column holds y_count LEDs, the half columns sit in between the full ones
+    columns = np.arange(2 * x_count - 1, dtype=np.float32)
+    rows = np.arange(y_count, dtype=np.float32)
+    xs = np.repeat(base_x + columns / 2, y_count)
+    up_ys = center_y - rows - 1
+    down_ys = center_y - (y_count - (rows + 0.5))
+    ys = np.where((columns % 2 == 0)[:, None], up_ys, down_ys).ravel()
+    return xs.astype(np.float32), ys.astype(np.float32)
+
+
 class LEDPanel:
     def __init__(
         self,
@@ -18,22 +36,16 @@ class LEDPanel:
         self.num_pixels = config.scale_per_panel_count
         self.index = index
         self.config = config
-        self._pixels: List[RGBW] = [RGBW(0, 0, 0, 0) for _ in range(self.num_pixels)]
-        self._buffer: List[RGBW] = [RGBW(0, 0, 0, 0) for _ in range(self.num_pixels)]
         self._brightness = brightness
         pin, channel = config.pins[index]
         self.strip = ControllerBase.init_strip(
             PixelStrip, self.num_pixels, pin, channel
         )
+        # Panel layout is fixed, so compute its position once
+        self.distance_from_center = index - (config.panel_count - 1) // 2
+        self._base_x = self._compute_base_x()
 
-    @property
-    def distance_from_center(self) -> int:
-        center_panel = int((self.config.panel_count - 1) / 2)
-        if self.index == center_panel:
-            return 0
-        return self.index - center_panel
-
-    def get_base_x(self) -> float:
+    def _compute_base_x(self) -> float:
         bottom_left_offset = -0.5 * self.config.x_count
         scales_offset = self.config.x_count * self.distance_from_center
         inter_panel_spacing_offset = (
@@ -41,9 +53,13 @@ class LEDPanel:
         )
         return bottom_left_offset + scales_offset + inter_panel_spacing_offset + 0.5
 
+    def get_base_x(self) -> float:
+        return self._base_x
+
     def set_color(self, color: RGBW) -> None:
-        for i in range(self.num_pixels):
-            self._buffer[i] = color
+        self.strip.setPixelColorArray(
+            np.full(self.num_pixels, color.pack(), dtype=np.uint32)
+        )
 
 
 class ScalePanelLEDController(ControllerBase):
@@ -54,53 +70,125 @@ class ScalePanelLEDController(ControllerBase):
             LEDPanel(self.PixelStrip, config, index, **kwargs)
             for index in range(config.panel_count)
         ]
+        # Coordinates of all panels as flat contiguous arrays in the order in
+        # which map_coordinates visits the LEDs, so vectorized callbacks handle
+        # every panel in a single call. panel_slices maps them back to panels.
+        self.panel_slices: List[slice] = []
+        panel_xs: List[np.ndarray] = []
+        panel_ys: List[np.ndarray] = []
         self.cached_coordinates: List[List[Tuple[float, float, Tuple[int, int]]]] = []
+        start = 0
         for panel in self.panels:
-            panel_cache: List[Tuple[float, float, Tuple[int, int]]] = []
-            base_x = panel.get_base_x()
-            center_y = self.config.y_count / 2
-            led_index = 0
-            y = 0
-            for x in range(self.config.x_count):
-                # First go up from the bottom left
-                for y in range(self.config.y_count):
-                    panel_cache.append(
-                        (base_x + x, center_y - y - 1, (panel.index, led_index))
-                    )
-                    led_index += 1
-                y += 1
-
-                if x != self.config.x_count - 1:
-                    # Then go down again
-                    for y in range(self.config.y_count):
-                        panel_cache.append(
-                            (
-                                base_x + x + 0.5,
-                                center_y - (self.config.y_count - (y + 0.5)),
-                                (panel.index, led_index),
-                            )
-                        )
-                        led_index += 1
-                    y += 1
-            self.cached_coordinates.append(panel_cache)
+            xs, ys = build_panel_coordinates(
+                self.config.x_count,
+                self.config.y_count,
+                panel.get_base_x(),
+                self.config.y_count / 2,
+            )
+            panel_xs.append(xs)
+            panel_ys.append(ys)
+            self.panel_slices.append(slice(start, start + panel.num_pixels))
+            start += panel.num_pixels
+            self.cached_coordinates.append(
+                [
+                    (x, y, (panel.index, led_index))
+                    for led_index, (x, y) in enumerate(zip(xs.tolist(), ys.tolist()))
+                ]
+            )
+        self.all_xs = np.concatenate(panel_xs)
+        self.all_ys = np.concatenate(panel_ys)
+        self.all_distances = np.hypot(self.all_xs, self.all_ys)
+        self._max_distance = float(self.all_distances.max())
+        self.all_scaled_distances = self.all_distances * np.float32(
+            1 / self._max_distance
+        )
+        # Same angles as ControllerBase.map_angle, in range [0, 2π)
+        angles = np.arctan2(self.all_ys, self.all_xs)
+        angles[angles < 0] += 2 * np.pi
+        self.all_angles = angles.astype(np.float32)
 
     def map_coordinates(
         self, callback: Callable[[float, float, Tuple[int, int]], Union[RGBW, None]]
     ) -> None:
-        for panel_cache in self.cached_coordinates:
-            for absolute_x, absolute_y, indices in panel_cache:
-                color = callback(absolute_x, absolute_y, indices)
+        self._map_cached_coordinates(
+            [panel.strip for panel in self.panels], self.cached_coordinates, callback
+        )
+
+    def set_pixels(self, colors: np.ndarray) -> None:
+        for panel, panel_slice in zip(self.panels, self.panel_slices):
+            panel.strip.setPixelColorArray(colors[panel_slice])
+
+    def map_coordinates_vectorized(
+        self, callback: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    ) -> None:
+        self.set_pixels(callback(self.all_xs, self.all_ys))
+
+    def _map_panel_values(
+        self,
+        values: np.ndarray,
+        callback: Callable[[float, Tuple[int, int]], Union[RGBW, None]],
+    ) -> None:
+        """Calls the callback with a precomputed value per LED, so no wrapping
+        callbacks are needed to derive it from the coordinates."""
+        for panel, panel_slice, panel_cache in zip(
+            self.panels, self.panel_slices, self.cached_coordinates
+        ):
+            set_pixel_color = panel.strip.setPixelColor
+            for value, (_, _, indices) in zip(
+                values[panel_slice].tolist(), panel_cache
+            ):
+                color = callback(value, indices)
                 if color is not None:
-                    panel_index, led_index = indices
-                    self.panels[panel_index].strip.setPixelColor(led_index, color)
+                    set_pixel_color(indices[1], color)
+
+    def get_max_distance(self) -> float:
+        return self._max_distance
+
+    @cache  # pylint: disable=method-cache-max-size-none
+    def get_scaled_coordinate_arrays(
+        self, force_positive: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return self._scale_coordinate_arrays(self.all_xs, self.all_ys, force_positive)
+
+    def get_distance_array(self) -> np.ndarray:
+        return self.all_distances
+
+    def get_scaled_distance_array(self) -> np.ndarray:
+        return self.all_scaled_distances
+
+    def map_distance(
+        self, callback: Callable[[float, Tuple[int, int]], Union[RGBW, None]]
+    ) -> None:
+        self._map_panel_values(self.all_distances, callback)
+
+    def map_distance_vectorized(
+        self, callback: Callable[[np.ndarray], np.ndarray]
+    ) -> None:
+        self.set_pixels(callback(self.get_distance_array()))
+
+    def map_scaled_distance(
+        self, callback: Callable[[float, Tuple[int, int]], Union[RGBW, None]]
+    ) -> None:
+        self._map_panel_values(self.all_scaled_distances, callback)
+
+    def map_scaled_distance_vectorized(
+        self, callback: Callable[[np.ndarray], np.ndarray]
+    ) -> None:
+        self.set_pixels(callback(self.get_scaled_distance_array()))
+
+    def map_angle(
+        self, callback: Callable[[float, Tuple[int, int]], Union[RGBW, None]]
+    ) -> None:
+        self._map_panel_values(self.all_angles, callback)
+
+    def map_angle_vectorized(
+        self, callback: Callable[[np.ndarray], np.ndarray]
+    ) -> None:
+        self.set_pixels(callback(self.all_angles))
 
     def get_coordinates(self, strip_index: int, led_index: int) -> Tuple[float, float]:
-        for absolute_x, absolute_y, indices in self.cached_coordinates[strip_index]:
-            if indices == (strip_index, led_index):
-                return absolute_x, absolute_y
-        raise ValueError(
-            f"Coordinates not found for panel {strip_index} and led {led_index}"
-        )
+        index = self.panel_slices[strip_index].start + led_index
+        return float(self.all_xs[index]), float(self.all_ys[index])
 
     def get_strips(self) -> List["MockPixelStrip"]:
         return [panel.strip for panel in self.panels]
@@ -1,11 +1,97 @@
 """Base class for LED effects"""
 
+import math
 import random
+from functools import lru_cache
 from abc import ABC, abstractmethod
-from typing import Any, Literal
+from typing import Any, Dict, Literal, Tuple, Union
+import numpy as np
 from leds.controllers.controller_base import ControllerBase
 from leds.color import RGBW
-from leds.effects.parameters import FloatParameter, EnumParameter
+from leds.jit import njit, numba_available, prange
+from leds.effects.parameters import FloatParameter, EnumParameter, Parameter
+
+# Rainbow colors for evenly spaced hues, computed once at import so rendering a
+# rainbow is a lookup. The size must be a power of two.
+RAINBOW_LUT_SIZE = 4096
+_RAINBOW_COLORS = [
+    RGBW.from_hsv(i * 360 / RAINBOW_LUT_SIZE, 1.0, 1.0) for i in range(RAINBOW_LUT_SIZE)
+]
+RAINBOW_LUT = np.array(_RAINBOW_COLORS, dtype=np.uint32)
+
+# For every 60 degree hue sector, which of (chroma, second largest, zero) ends
+# up in the red, green and blue channels, see RGBW.from_hsv
+_HSV_SECTOR_R = np.array([0, 1, 2, 2, 1, 0])
+_HSV_SECTOR_G = np.array([1, 0, 0, 1, 2, 2])
+_HSV_SECTOR_B = np.array([2, 2, 1, 0, 0, 1])
+
+MIN_SENSITIVITY = 100  # Repeat every 100ms
+MAX_SENSITIVITY = 1000 * 60 * 5  # Repeat every 5 minutes
+_LOG_SENSITIVITY_RATIO = math.log(MAX_SENSITIVITY / MIN_SENSITIVITY)
+
+
+@lru_cache(maxsize=128)
+def _get_actual_sensitivity(speed: float) -> float:
+    # Use exponential scaling to make sensitivity feel more natural. The speed
+    # only changes when the user changes it, so this is cached.
+    return MIN_SENSITIVITY * math.exp(_LOG_SENSITIVITY_RATIO * (1 - speed))
+
+
+# Compiled for the coordinate array types at import (and cached on disk), so the
+# first frame does not wait for the JIT
+@njit(
+    [
+        "uint32[:](uint32, uint32, float32[:])",
+        "uint32[:](uint32, uint32, float64[:])",
+    ],
+    cache=True,
+)
+def _interpolate_packed_linear(
+    from_color: int, to_color: int, values: np.ndarray
+) -> np.ndarray:
+    """Linearly interpolates between two packed colors for every value, used
+    when it can be compiled with numba. Rounds the same way as the numpy
+    version of the linear interpolation."""
+    out = np.empty(values.shape[0], dtype=np.uint32)
+    for i in range(values.shape[0]):
+        result = 0
+        for shift in (24, 16, 8, 0):
+            from_channel = np.float32((from_color >> shift) & 0xFF)
+            to_channel = np.float32((to_color >> shift) & 0xFF)
+            channel = from_channel + (to_channel - from_channel) * values[i]
+            result |= int(max(0.0, min(255.0, channel))) << shift
+        out[i] = result
+    return out
+
+
+# Below this many LEDs starting threads costs more than the gather itself
+PARALLEL_LUT_THRESHOLD = 16384
+
+
+_LUT_SIGNATURE = "void(uint32[:], intp[:], intp, uint32[:])"
+
+
+# The two variants are separate functions since numba caches compiled code by
+# function and signature, not by the parallel flag
+@njit(_LUT_SIGNATURE, nogil=True, cache=True)
+def _gather_shifted_lut(
+    lut: np.ndarray, indices: np.ndarray, shift: int, out: np.ndarray
+) -> None:
+    """Compiled version of the lookup in Effect.render_lut, only used when it
+    can be compiled with numba"""
+    mask = lut.shape[0] - 1
+    for i in range(indices.shape[0]):
+        out[i] = lut[(indices[i] + shift) & mask]
+
+
+@njit(_LUT_SIGNATURE, parallel=True, nogil=True, cache=True)
+def _gather_shifted_lut_parallel(
+    lut: np.ndarray, indices: np.ndarray, shift: int, out: np.ndarray
+) -> None:
+    """Like _gather_shifted_lut, but spread over all cores"""
+    mask = lut.shape[0] - 1
+    for i in prange(indices.shape[0]):
+        out[i] = lut[(indices[i] + shift) & mask]
 
 
 class SpeedParameters(ABC):
@@ -61,6 +147,37 @@ class ColorMigration:
         return color
 
 
+class ColorMigrationBatch:
+    """A number of independent ColorMigrations whose colors are computed
+    together, holding the state of every migration in arrays"""
+
+    def __init__(self, count: int):
+        self.from_colors = np.zeros(count, dtype=np.uint32)
+        self.to_colors = np.zeros(count, dtype=np.uint32)
+        self.time_offsets = np.zeros(count, dtype=np.float64)
+        for i in range(count):
+            self.to_colors[i] = RGBW.from_hsv(random.uniform(0, 360), 1, 1)
+            self.re_init(i, 0.0)
+
+    def re_init(self, index: int, time_offset: float):
+        self.from_colors[index] = self.to_colors[index]
+        self.to_colors[index] = RGBW.from_hsv(random.uniform(0, 360), 1, 1)
+        self.time_offsets[index] = time_offset + random.uniform(0, 0.5)
+
+    def run_iteration(
+        self, value: float, interpolation: Literal["linear", "hsv"]
+    ) -> np.ndarray:
+        """Like ColorMigration.run_iteration, returns the packed color of every
+        migration"""
+        relative_time_offsets = value - self.time_offsets
+        colors = Effect.interpolate_color_vectorized(
+            self.from_colors, self.to_colors, relative_time_offsets, interpolation
+        )
+        for index in np.flatnonzero(relative_time_offsets >= 1).tolist():
+            self.re_init(index, value)
+        return colors
+
+
 class Effect(ABC):
     """Base class for LED effects"""
 
@@ -85,6 +202,18 @@ class Effect(ABC):
 
         return result
 
+    def get_parameters(self) -> Dict[str, Parameter]:
+        """Returns the parameters of the effect by name"""
+        return vars(self.PARAMETERS)
+
+    def set_parameter_values(self, values: Dict[str, Any]) -> None:
+        """Sets the value of every named parameter, unknown names are ignored"""
+        parameters = self.get_parameters()
+        for name, value in values.items():
+            parameter = parameters.get(name)
+            if parameter is not None:
+                parameter.set_value(value)
+
     @abstractmethod
     def run(self, ms: int):
         pass
@@ -149,6 +278,115 @@ class Effect(ABC):
 
         return RGBW(r, g, b, w)
 
+    @staticmethod
+    def __to_hsv_vectorized(
+        colors: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized version of RGBW.hsv for packed colors"""
+        r, g, b, _ = RGBW.unpack_array(colors)
+        r = r / 255.0
+        g = g / 255.0
+        b = b / 255.0
+
+        cmax = np.maximum(np.maximum(r, g), b)
+        diff = cmax - np.minimum(np.minimum(r, g), b)
+        # Grays have no hue, avoid dividing by zero for them
+        safe_diff = np.where(diff == 0, 1.0, diff)
+        h = np.select(
+            [diff == 0, cmax == r, cmax == g],
+            [
+                0.0,
+                (60 * ((g - b) / safe_diff) + 360) % 360,
+                (60 * ((b - r) / safe_diff) + 120) % 360,
+            ],
+            (60 * ((r - g) / safe_diff) + 240) % 360,
+        )
+        s = np.where(cmax == 0, 0.0, diff / np.where(cmax == 0, 1.0, cmax))
+        return h, s, cmax
+
+    @staticmethod
+    def __from_hsv_vectorized(
+        h: np.ndarray, s: np.ndarray, v: np.ndarray, w: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized version of RGBW.from_hsv, returns packed colors"""
+        h = h % 360
+        s = np.clip(s, 0, 1)
+        v = np.clip(v, 0, 1)
+
+        c = v * s
+        x = c * (1 - np.abs((h / 60) % 2 - 1))
+        m = v - c
+
+        sectors = np.minimum(h // 60, 5).astype(np.int64)
+        options = (c, x, 0.0)
+        r = np.choose(_HSV_SECTOR_R[sectors], options)
+        g = np.choose(_HSV_SECTOR_G[sectors], options)
+        b = np.choose(_HSV_SECTOR_B[sectors], options)
+
+        return RGBW.pack_array(
+            (r + m) * 255, (g + m) * 255, (b + m) * 255, np.clip(w, 0, 255)
+        )
+
+    @staticmethod
+    def __interpolate_color_hsv_vectorized(
+        from_color: Union[int, np.ndarray],
+        to_color: Union[int, np.ndarray],
+        values: np.ndarray,
+    ) -> np.ndarray:
+        """Vectorized version of __interpolate_color_hsv
+        Args:
+            from_color (Union[int, np.ndarray]): Packed starting color(s)
+            to_color (Union[int, np.ndarray]): Packed ending color(s)
+            values (np.ndarray): Interpolation values between 0 and 1
+        Returns:
+            np.ndarray: Packed interpolated colors
+        """
+        from_colors = np.asarray(from_color, dtype=np.uint32)
+        to_colors = np.asarray(to_color, dtype=np.uint32)
+        values = np.asarray(values, dtype=np.float64)
+        h1, s1, v1 = Effect.__to_hsv_vectorized(from_colors)
+        h2, s2, v2 = Effect.__to_hsv_vectorized(to_colors)
+
+        # Take the shortest path around the color wheel
+        wrap = np.abs(h2 - h1) > 180
+        h1, h2 = (
+            np.where(wrap & (h1 < h2), h1 + 360, h1),
+            np.where(wrap & (h1 >= h2), h2 + 360, h2),
+        )
+
+        w1 = RGBW.unpack_array(from_colors)[3].astype(np.float64)
+        w2 = RGBW.unpack_array(to_colors)[3].astype(np.float64)
+        return Effect.__from_hsv_vectorized(
+            (h1 + (h2 - h1) * values) % 360,
+            s1 + (s2 - s1) * values,
+            v1 + (v2 - v1) * values,
+            w1 + (w2 - w1) * values,
+        )
+
+    @staticmethod
+    def __interpolate_color_linear_vectorized(
+        from_color: Union[int, np.ndarray],
+        to_color: Union[int, np.ndarray],
+        values: np.ndarray,
+    ) -> np.ndarray:
+        """Vectorized version of __interpolate_color_linear
+        Args:
+            from_color (Union[int, np.ndarray]): Packed starting color(s)
+            to_color (Union[int, np.ndarray]): Packed ending color(s)
+            values (np.ndarray): Interpolation values between 0 and 1
+        Returns:
+            np.ndarray: Packed interpolated colors
+        """
+        from_colors = np.asarray(from_color, dtype=np.uint32)
+        to_colors = np.asarray(to_color, dtype=np.uint32)
+        result = np.zeros(np.shape(values), dtype=np.uint32)
+        for shift in (24, 16, 8, 0):
+            from_channel = ((from_colors >> shift) & 0xFF).astype(np.float32)
+            to_channel = ((to_colors >> shift) & 0xFF).astype(np.float32)
+            channel = from_channel + (to_channel - from_channel) * values
+            result |= np.clip(channel, 0, 255).astype(np.uint32) << shift
+        return result
+
     @staticmethod
     def interpolate_color(
         from_color: RGBW,
@@ -160,16 +398,35 @@ class Effect(ABC):
             return Effect.__interpolate_color_hsv(from_color, to_color, value)
         return Effect.__interpolate_color_linear(from_color, to_color, value)
 
+    @staticmethod
+    def interpolate_color_vectorized(
+        from_color: Union[int, np.ndarray],
+        to_color: Union[int, np.ndarray],
+        values: np.ndarray,
+        interpolation: Literal["linear", "hsv"],
+    ) -> np.ndarray:
+        """Vectorized version of interpolate_color, returns packed colors"""
+        if interpolation == "hsv":
+            return Effect.__interpolate_color_hsv_vectorized(
+                from_color, to_color, values
+            )
+        if (
+            numba_available
+            and np.ndim(from_color) == 0
+            and np.ndim(to_color) == 0
+            and values.ndim == 1
+            and values.dtype in (np.float32, np.float64)
+        ):
+            return _interpolate_packed_linear(int(from_color), int(to_color), values)
+        return Effect.__interpolate_color_linear_vectorized(
+            from_color, to_color, values
+        )
+
     @staticmethod
     def time_offset(
         ms: int, speed: float, direction: str = "in", mod: bool = True
     ) -> float:
-        min_sensitivity = 100  # Repeat every 100ms
-        max_sensitivity = 1000 * 60 * 5  # Repeat every 5 minutes
-        # Use exponential scaling to make sensitivity feel more natural
-        actual_sensitivity = min_sensitivity * pow(
-            max_sensitivity / min_sensitivity, 1 - speed
-        )
+        actual_sensitivity = _get_actual_sensitivity(speed)
         if mod:
             offset = (ms % actual_sensitivity) / actual_sensitivity
         else:
@@ -180,6 +437,35 @@ class Effect(ABC):
 
     @staticmethod
     def rainbow(value: float) -> RGBW:
-        value = value % 1
-        # Convert directly to HSV for smoother rainbow transitions
-        return RGBW.from_hsv(value * 360, 1.0, 1.0)
+        index = math.floor(value * RAINBOW_LUT_SIZE) & (RAINBOW_LUT_SIZE - 1)
+        return _RAINBOW_COLORS[index]
+
+    @staticmethod
+    def rainbow_vectorized(values: np.ndarray) -> np.ndarray:
+        """Vectorized version of rainbow using the precomputed RAINBOW_LUT,
+        returns packed colors"""
+        indices = np.floor(values * RAINBOW_LUT_SIZE).astype(np.int64)
+        return RAINBOW_LUT[indices & (RAINBOW_LUT_SIZE - 1)]
+
+    @staticmethod
+    def get_lut_indices(values: np.ndarray, lut_size: int) -> np.ndarray:
+        """Converts values where 1 is a full cycle to indices into a lookup
+        table of the given size, to be passed to render_lut"""
+        return np.floor(values * lut_size).astype(np.intp)
+
+    def render_lut(self, lut: np.ndarray, indices: np.ndarray, offset: float) -> None:
+        """Sets every LED to its entry in a lookup table of packed colors, shifted
+        by the offset where 1 is a full cycle. The indices come from
+        get_lut_indices, in the order set_pixels expects. The size of the table
+        must be a power of two."""
+        lut_size = lut.shape[0]
+        shift = math.floor(offset * lut_size)
+        framebuffer = self.controller.get_framebuffer()
+        if numba_available:
+            if indices.shape[0] >= PARALLEL_LUT_THRESHOLD:
+                _gather_shifted_lut_parallel(lut, indices, shift, framebuffer)
+            else:
+                _gather_shifted_lut(lut, indices, shift, framebuffer)
+        else:
+            np.take(lut, (indices + shift) & (lut_size - 1), out=framebuffer)
+        self.controller.set_pixels(framebuffer)
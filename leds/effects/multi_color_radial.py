@@ -1,4 +1,6 @@
 import math
+from typing import Optional, Tuple
+import numpy as np
 from leds.controllers.controller_base import ControllerBase
 from leds.effects.parameters import ColorListParameter
 from leds.effects.effect import (
@@ -6,7 +8,44 @@ from leds.effects.effect import (
     SpeedWithDirectionParameters,
     ColorInterpolationParameters,
 )
-from leds.color import RGBW, Color
+from leds.color import Color
+from leds.jit import njit, numba_available
+
+# Number of precomputed colors along the gradient, must be a power of two
+GRADIENT_SIZE = 4096
+
+
+# Only rebuilds the gradient when the colors change, which is too little work
+# to spread over threads. Compiled at import (and cached on disk) so changing
+# the colors does not wait for the JIT.
+@njit(
+    [
+        "void(float32[:], uint32[:], uint32[:])",
+        "void(float64[:], uint32[:], uint32[:])",
+    ],
+    nogil=True,
+    cache=True,
+)
+def _linear_colors_at_distances(
+    distances: np.ndarray, colors: np.ndarray, out: np.ndarray
+) -> None:
+    """Single pass version of colors_at_distances for linear interpolation,
+    only used when it can be compiled with numba"""
+    color_count = colors.shape[0]
+    for i in range(distances.shape[0]):
+        index = (distances[i] % 1.0) * color_count
+        lower_bound = int(math.floor(index)) % color_count
+        upper_bound = (lower_bound + 1) % color_count
+        value = index % 1.0
+        from_color = colors[lower_bound]
+        to_color = colors[upper_bound]
+        result = 0
+        for shift in (24, 16, 8, 0):
+            from_channel = (from_color >> shift) & 0xFF
+            to_channel = (to_color >> shift) & 0xFF
+            channel = from_channel + (to_channel - from_channel) * value
+            result |= int(max(0.0, min(255.0, channel))) << shift
+        out[i] = result
 
 
 class MultiColorRadialParameters(
@@ -24,28 +63,51 @@ class MultiColorRadialEffect(Effect):
     def __init__(self, controller: ControllerBase):
         super().__init__(controller)
         self.PARAMETERS = MultiColorRadialParameters()
+        # The gradient only moves outwards, so each LED's position in it is fixed
+        self.distance_indices = Effect.get_lut_indices(
+            controller.get_scaled_distance_array(), GRADIENT_SIZE
+        )
+        self._gradient = np.zeros(GRADIENT_SIZE, dtype=np.uint32)
+        self._gradient_key: Tuple[Optional[np.ndarray], str] = (None, "")
+
+    def get_gradient(self) -> np.ndarray:
+        """Returns the colors at GRADIENT_SIZE evenly spaced positions along the
+        gradient, only recomputed when the colors or interpolation change"""
+        colors = self.PARAMETERS.colors.get_packed_value()
+        interpolation = self.PARAMETERS.interpolation.get_value()
+        if (
+            self._gradient_key[0] is not colors
+            or self._gradient_key[1] != interpolation
+        ):
+            self._gradient = self.colors_at_distances(
+                np.arange(GRADIENT_SIZE) / GRADIENT_SIZE
+            )
+            self._gradient_key = (colors, interpolation)
+        return self._gradient
 
-    def color_at_distance(self, distance: float) -> RGBW:
-        distance = distance % 1
-        if distance < 0:
-            distance = 1 + distance
-
-        colors = self.PARAMETERS.colors.get_value()
-        index = distance * (len(colors))
-        lower_bound = math.floor(index)
-        upper_bound = 0 if index == len(colors) else math.ceil(index) % len(colors)
-        return Effect.interpolate_color(
-            colors[lower_bound],
-            colors[upper_bound],
-            (index - lower_bound) % 1,
-            self.PARAMETERS.interpolation.get_value(),
+    def colors_at_distances(self, distances: np.ndarray) -> np.ndarray:
+        colors = self.PARAMETERS.colors.get_packed_value()
+        interpolation = self.PARAMETERS.interpolation.get_value()
+        if numba_available and interpolation == "linear":
+            out = np.empty(distances.shape[0], dtype=np.uint32)
+            _linear_colors_at_distances(distances, colors, out)
+            return out
+
+        indices = (distances % 1) * len(colors)
+        lower_bounds = np.floor(indices).astype(np.int64)
+        # Distances just below 1 can round up to exactly len(colors)
+        lower_bounds %= len(colors)
+        upper_bounds = (lower_bounds + 1) % len(colors)
+        return Effect.interpolate_color_vectorized(
+            colors[lower_bounds],
+            colors[upper_bounds],
+            indices % 1,
+            interpolation,
         )
 
     def run(self, ms: int):
         offset = Effect.time_offset(
             ms, self.PARAMETERS.speed.get_value(), self.PARAMETERS.direction.get_value()
         )
-        self.controller.map_scaled_distance(
-            lambda distance, index: self.color_at_distance(distance + offset)
-        )
+        self.render_lut(self.get_gradient(), self.distance_indices, offset)
         self.controller.show()
@@ -1,17 +1,29 @@
 """Utility for exporting effect parameters to frontend-friendly formats"""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from leds.effects.parameters import Parameter
 from leds.effects.effect import Effect
 
+# The last export as (id of the effects dict, Parameter.version, export)
+_cached_export: Optional[Tuple[int, int, Dict[str, Dict[str, Any]]]] = None
+
 
 def get_all_effects_parameters(effects: Dict[str, Effect]) -> Dict[str, Dict[str, Any]]:
-    """Get parameters for all effects in the system"""
+    """Get parameters for all effects in the system. The result is cached until
+    a parameter is set, so it should not be modified."""
+    global _cached_export  # pylint: disable=global-statement
+    if (
+        _cached_export is not None
+        and _cached_export[0] == id(effects)
+        and _cached_export[1] == Parameter.version
+    ):
+        return _cached_export[2]
+
     result: Dict[str, Dict[str, Any]] = {}
     for effect_name, effect_class in effects.items():
         params: Dict[str, Dict[str, Any]] = {}
-        for key, value in effect_class.PARAMETERS.__dict__.items():
-            typed_param: Parameter = value
-            params[key] = typed_param.json()
+        for key, parameter in effect_class.get_parameters().items():
+            params[key] = parameter.json()
         result[effect_name] = params
+    _cached_export = (id(effects), Parameter.version, result)
     return result
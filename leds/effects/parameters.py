@@ -1,9 +1,10 @@
 """Parameter definitions for LED effects"""
 
 from dataclasses import dataclass
-from typing import Any, List, Dict, Optional
+from typing import Any, ClassVar, List, Dict, Optional
 from abc import ABC, abstractmethod
 from enum import Enum
+import numpy as np
 from leds.color import RGBW, Color
 
 
@@ -24,6 +25,8 @@ class Parameter(ABC):
     description: str = ""
     value: Any = None
     type: ParameterType = NotImplemented
+    # Bumped whenever any parameter is set, so exports can be cached until then
+    version: ClassVar[int] = 0
 
     def __init__(self, default: Any = None, description: str = ""):
         self.default = default if default is not None else self.default
@@ -38,6 +41,7 @@ class Parameter(ABC):
     def set_value(self, value: Any):
         """Set the value of the parameter"""
         self.value = value
+        Parameter.version += 1
 
     def json(self) -> Dict[str, Any]:
         return {
@@ -54,11 +58,16 @@ class FloatParameter(Parameter):
     type: ParameterType = ParameterType.FLOAT
 
     def __init__(self, default: float = 0.0, description: str = ""):
-        super().__init__(default, description)
+        super().__init__(float(default), description)
 
     def get_value(self) -> float:
         """Get the value of the parameter"""
-        return float(self.value)
+        # Converted to a float once when set, rather than on every read
+        return self.value
+
+    def set_value(self, value: float):
+        """Set the value of the parameter"""
+        super().set_value(float(value))
 
 
 class ColorParameter(Parameter):
@@ -76,7 +85,7 @@ class ColorParameter(Parameter):
 
     def set_value(self, value: Dict[str, int]):
         """Set the value of the parameter"""
-        self.value = Color(value["r"], value["g"], value["b"])
+        super().set_value(Color(value["r"], value["g"], value["b"]))
 
     def json(self) -> Dict[str, Any]:
         return {**super().json(), "value": self.value.to_dict()}
@@ -115,14 +124,27 @@ class ColorListParameter(Parameter):
     def __init__(self, default: Optional[List[RGBW]] = None, description: str = ""):
         super().__init__(default, description)
         self.default = default or []
+        self._packed_value: Optional[np.ndarray] = None
+        self._packed_source: Optional[List[RGBW]] = None
 
     def get_value(self) -> List[RGBW]:
         """Get the value of the parameter"""
         return self.value
 
+    def get_packed_value(self) -> np.ndarray:
+        """Get the value of the parameter as an array of packed colors (see
+        RGBW.pack). The array is reused until the value changes, so it should
+        not be modified."""
+        if self._packed_value is None or self._packed_source is not self.value:
+            self._packed_value = np.array(self.value, dtype=np.uint32)
+            self._packed_source = self.value
+        return self._packed_value
+
     def set_value(self, value: List[Dict[str, int]]):
         """Set the value of the parameter"""
-        self.value = [Color(color["r"], color["g"], color["b"]) for color in value]
+        super().set_value(
+            [Color(color["r"], color["g"], color["b"]) for color in value]
+        )
 
     def json(self) -> Dict[str, Any]:
         """Override json method to properly serialize RGBW objects in the list"""
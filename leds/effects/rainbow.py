@@ -1,4 +1,10 @@
-from leds.effects.effect import Effect, SpeedWithDirectionParameters
+import numpy as np
+from leds.effects.effect import (
+    Effect,
+    SpeedWithDirectionParameters,
+    RAINBOW_LUT,
+    RAINBOW_LUT_SIZE,
+)
 from leds.controllers.scale_panel_controller import ScalePanelLEDController
 
 
@@ -11,16 +17,15 @@ class RainbowEffect(Effect):
         super().__init__(controller)
         self.controller = controller
         self.PARAMETERS = RainbowParameters()
+        # The rainbow spans all LEDs once, in LED order
+        total_pixels = controller.config.get_led_count()
+        self.pixel_indices = Effect.get_lut_indices(
+            np.arange(total_pixels) / total_pixels, RAINBOW_LUT_SIZE
+        )
 
     def run(self, ms: int):
         offset = Effect.time_offset(
             ms, self.PARAMETERS.speed.get_value(), self.PARAMETERS.direction.get_value()
         )
-        total_pixels = self.controller.config.get_led_count()
-        for i, panel in enumerate(self.controller.panels):
-            for j in range(panel.strip.numPixels()):
-                pixel_index = i * panel.strip.numPixels() + j
-                panel.strip.setPixelColor(
-                    j, Effect.rainbow(pixel_index / total_pixels + offset)
-                )
+        self.render_lut(RAINBOW_LUT, self.pixel_indices, offset)
         self.controller.show()
@@ -1,4 +1,9 @@
-from leds.effects.effect import Effect, SpeedWithDirectionParameters
+from leds.effects.effect import (
+    Effect,
+    SpeedWithDirectionParameters,
+    RAINBOW_LUT,
+    RAINBOW_LUT_SIZE,
+)
 from leds.controllers.controller_base import ControllerBase
 
 
@@ -10,12 +15,13 @@ class RainbowRadialEffect(Effect):
     def __init__(self, controller: ControllerBase):
         super().__init__(controller)
         self.PARAMETERS = RainbowRadialParameters()
+        self.distance_indices = Effect.get_lut_indices(
+            controller.get_scaled_distance_array(), RAINBOW_LUT_SIZE
+        )
 
     def run(self, ms: int):
         offset = Effect.time_offset(
             ms, self.PARAMETERS.speed.get_value(), self.PARAMETERS.direction.get_value()
         )
-        self.controller.map_scaled_distance(
-            lambda distance, index: Effect.rainbow(distance + offset)
-        )
+        self.render_lut(RAINBOW_LUT, self.distance_indices, offset)
         self.controller.show()
@@ -1,4 +1,10 @@
-from leds.effects.effect import Effect, SpeedWithDirectionParameters
+import numpy as np
+from leds.effects.effect import (
+    Effect,
+    SpeedWithDirectionParameters,
+    RAINBOW_LUT,
+    RAINBOW_LUT_SIZE,
+)
 from leds.controllers.hex_controller import HexPanelLEDController
 
 
@@ -11,16 +17,19 @@ class RainbowSpinEffect(Effect):
         super().__init__(controller)
         self.controller = controller
         self.PARAMETERS = RainbowSpinParameters()
+        # Same order as set_pixels: panel by panel, following ordered_leds
+        angles = np.array(
+            [
+                panel.get_angle_at_index(led_index)
+                for panel in controller.panels
+                for led_index in panel.panel_config.ordered_leds
+            ]
+        )
+        self.angle_indices = Effect.get_lut_indices(angles / 360, RAINBOW_LUT_SIZE)
 
     def run(self, ms: int):
         offset = Effect.time_offset(
             ms, self.PARAMETERS.speed.get_value(), self.PARAMETERS.direction.get_value()
         )
-
-        for panel in self.controller.panels:
-            for led_index in panel.panel_config.ordered_leds:
-                angle = panel.get_angle_at_index(led_index)
-                panel.strip.setPixelColor(
-                    led_index, Effect.rainbow((angle / 360) + offset)
-                )
+        self.render_lut(RAINBOW_LUT, self.angle_indices, offset)
         self.controller.show()
@@ -1,3 +1,4 @@
+import numpy as np
 from leds.effects.effect import (
     Effect,
     SpeedWithDirectionParameters,
@@ -27,35 +28,29 @@ class RandomColorDualEffect(Effect):
         self.first_color_migrations = ColorMigration()
         self.second_color_migrations = ColorMigration()
 
+    def get_positions(self, orientation: str) -> np.ndarray:
+        """Returns the position of every LED along the gradient for the given
+        orientation, in set_pixels order"""
+        if orientation == "radial":
+            return self.controller.get_scaled_distance_array()
+        xs, ys = self.controller.get_scaled_coordinate_arrays(force_positive=True)
+        return xs if orientation == "horizontal" else ys
+
     def run(self, ms: int):
         offset = Effect.time_offset(ms, self.PARAMETERS.speed.get_value(), mod=False)
+        interpolation = self.PARAMETERS.interpolation.get_value()
 
         first_color = self.first_color_migrations.run_iteration(
-            abs(offset), self.PARAMETERS.interpolation.get_value()
+            abs(offset), interpolation
         )
         second_color = self.second_color_migrations.run_iteration(
-            abs(offset), self.PARAMETERS.interpolation.get_value()
+            abs(offset), interpolation
         )
 
-        orientation = self.PARAMETERS.orientation.get_value()
-        if orientation in ["horizontal", "vertical"]:
-            self.controller.map_scaled_coordinates(
-                lambda x, y, index: Effect.interpolate_color(
-                    first_color,
-                    second_color,
-                    x if orientation == "horizontal" else y,
-                    self.PARAMETERS.interpolation.get_value(),
-                ),
-                force_positive=True,
-            )
-        elif orientation == "radial":
-            self.controller.map_scaled_distance(
-                lambda distance, index: Effect.interpolate_color(
-                    first_color,
-                    second_color,
-                    distance,
-                    self.PARAMETERS.interpolation.get_value(),
-                )
+        positions = self.get_positions(self.PARAMETERS.orientation.get_value())
+        self.controller.set_pixels(
+            Effect.interpolate_color_vectorized(
+                first_color, second_color, positions, interpolation
             )
-
+        )
         self.controller.show()
@@ -1,8 +1,9 @@
+import numpy as np
 from leds.effects.effect import (
     Effect,
     SpeedParameters,
     ColorInterpolationParameters,
-    ColorMigration,
+    ColorMigrationBatch,
 )
 from leds.controllers.hex_controller import HexPanelLEDController
 
@@ -16,17 +17,18 @@ class RandomColorHexEffect(Effect):
         super().__init__(controller)
         self.PARAMETERS = RandomColorHexParameters()
         self.controller = controller
-        self.color_migrations = [
-            ColorMigration() for _ in range(len(self.controller.panels))
-        ]
+        self.color_migrations = ColorMigrationBatch(len(self.controller.panels))
+        # The panel of every LED in set_pixels order, so a frame is one gather of
+        # the panel colors instead of a setPixelColor call per LED
+        _, _, self.led_panel_indices, _ = controller.get_coordinate_arrays()
 
     def run(self, ms: int):
         offset = Effect.time_offset(ms, self.PARAMETERS.speed.get_value(), mod=False)
 
-        for i, panel in enumerate(self.controller.panels):
-            color = self.color_migrations[i].run_iteration(
-                abs(offset), self.PARAMETERS.interpolation.get_value()
-            )
-            panel.set_color(color)
-
+        panel_colors = self.color_migrations.run_iteration(
+            abs(offset), self.PARAMETERS.interpolation.get_value()
+        )
+        framebuffer = self.controller.get_framebuffer()
+        np.take(panel_colors, self.led_panel_indices, out=framebuffer)
+        self.controller.set_pixels(framebuffer)
         self.controller.show()
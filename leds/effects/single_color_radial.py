@@ -1,8 +1,12 @@
-import math
+from typing import Optional, Tuple
+import numpy as np
 from leds.controllers.controller_base import ControllerBase
 from leds.effects.parameters import ColorParameter, FloatParameter
 from leds.effects.effect import Effect, SpeedWithDirectionParameters
-from leds.color import RGBW, Color
+from leds.color import Color, RGBW
+
+# Number of precomputed colors along the gradient, must be a power of two
+GRADIENT_SIZE = 4096
 
 
 class SingleColorRadialParameters(SpeedWithDirectionParameters):
@@ -22,24 +26,42 @@ class SingleColorRadialEffect(Effect):
     def __init__(self, controller: ControllerBase):
         super().__init__(controller)
         self.PARAMETERS = SingleColorRadialParameters()
+        self.distance_indices = Effect.get_lut_indices(
+            controller.get_scaled_distance_array(), GRADIENT_SIZE
+        )
+        self._gradient = np.zeros(GRADIENT_SIZE, dtype=np.uint32)
+        self._gradient_key: Optional[Tuple[int, float]] = None
 
-    def color_at_distance(self, distance: float) -> RGBW:
+    def get_gradient(self) -> np.ndarray:
+        """Returns the colors at GRADIENT_SIZE evenly spaced positions along the
+        gradient, only recomputed when the color or lower bound change"""
+        key = (
+            int(self.PARAMETERS.color.get_value()),
+            self.PARAMETERS.lower_bound.get_value(),
+        )
+        if self._gradient_key != key:
+            self._gradient = self.colors_at_distances(
+                np.arange(GRADIENT_SIZE) / GRADIENT_SIZE
+            )
+            self._gradient_key = key
+        return self._gradient
+
+    def colors_at_distances(self, distances: np.ndarray) -> np.ndarray:
         lower_bound = self.PARAMETERS.lower_bound.get_value()
         color = self.PARAMETERS.color.get_value()
         diff = 1 - lower_bound
-        abs_distance = (distance if distance < 0.5 else 1 - distance) * 2
-        final_brightness = lower_bound + diff * abs_distance
-        return Color(
-            math.floor(color.r * final_brightness),
-            math.floor(color.g * final_brightness),
-            math.floor(color.b * final_brightness),
+        # Triangle wave, 0 at the edges and 1 halfway
+        abs_distances = 1 - np.abs(2 * distances - 1)
+        final_brightness = lower_bound + diff * abs_distances
+        return RGBW.pack_array(
+            color.r * final_brightness,
+            color.g * final_brightness,
+            color.b * final_brightness,
         )
 
     def run(self, ms: int):
         offset = Effect.time_offset(
             ms, self.PARAMETERS.speed.get_value(), self.PARAMETERS.direction.get_value()
         )
-        self.controller.map_scaled_distance(
-            lambda distance, index: self.color_at_distance(((distance) + offset) % 1)
-        )
+        self.render_lut(self.get_gradient(), self.distance_indices, offset)
         self.controller.show()
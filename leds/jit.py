@@ -0,0 +1,28 @@
+"""Optional numba support, everything works without numba installed.
+
+Kernels are decorated with njit either way. Without numba njit returns the
+plain Python function and prange is range, so callers that only want the
+compiled version check numba_available first."""
+
+from typing import Any, Callable
+
+try:
+    from numba import njit, prange  # type: ignore
+
+    numba_available = True
+except ImportError:
+    prange = range
+    numba_available = False
+
+    def njit(*args: Any, **kwargs: Any) -> Any:  # pylint: disable=unused-argument
+        """Stand-in for numba.njit, supports both @njit and @njit(...)"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+
+        def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+            return function
+
+        return decorator
+
+
+__all__ = ["njit", "prange", "numba_available"]
@@ -2,23 +2,30 @@
 
 import os
 import sys
+import atexit
 import time
 import threading
 import logging
 import json
-from typing import Any, Dict, Optional, Union
+import hashlib
+import mimetypes
+from typing import Any, Dict, Optional, Tuple, Union
 from pathlib import Path
+import numpy as np
 from flask import (  # pylint: disable=import-error
     Flask,
+    Response,
+    abort,
     render_template,
     jsonify,
-    send_from_directory,
     request,
 )
 from flask.json.provider import JSONProvider  # pylint: disable=import-error
 from flask_socketio import SocketIO  # pylint: disable=import-error
+from werkzeug.security import safe_join  # pylint: disable=import-error
 from leds.effects import Effect, get_effects
 from leds.effects.parameter_export import get_all_effects_parameters
+from leds.effects.parameters import Parameter
 from leds.effects.rainbow_radial import RainbowRadialEffect
 from leds.controllers.controller_base import RGBW
 from config import get_led_controller, BaseConfig, get_config, ConfigMode
@@ -27,9 +34,59 @@ from config import get_led_controller, BaseConfig, get_config, ConfigMode
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+# Some systems map these extensions to the wrong MIME type, which breaks loading
+# the visualizer's JavaScript modules
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("text/css", ".css")
+mimetypes.add_type("text/html", ".html")
+mimetypes.add_type("application/json", ".json")
+mimetypes.add_type("image/svg+xml", ".svg")
+
+
+def _read_static_file(name: str) -> Optional[Tuple[bytes, str, str]]:
+    """Reads a file by its path relative to STATIC_DIR (as used in /static/<path>
+    URLs) and returns it with its MIME type and an ETag, or None if there is
+    no such file"""
+    path = safe_join(STATIC_DIR, name)
+    if path is None or not os.path.isfile(path):
+        return None
+    body = Path(path).read_bytes()
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return body, mimetype, hashlib.sha1(body).hexdigest()
+
+
+def _read_static_files() -> Dict[str, Tuple[bytes, str, str]]:
+    """Reads every file in STATIC_DIR with _read_static_file, keyed by name"""
+    files: Dict[str, Tuple[bytes, str, str]] = {}
+    for directory, _, filenames in os.walk(STATIC_DIR):
+        for filename in filenames:
+            path = Path(directory, filename)
+            name = path.relative_to(STATIC_DIR).as_posix()
+            static_file = _read_static_file(name)
+            if static_file is not None:
+                files[name] = static_file
+    return files
+
+
+# Time between the start of two frames (in seconds)
 SLEEP_TIME_MOCK = 0.05
 # Is sleeping even needed?
 SLEEP_TIME_REAL = 0.005
+# A full led_update frame is sent at least this often (in seconds), in between
+# only the changed LEDs are sent as led_delta
+KEYFRAME_INTERVAL = 2.0
+# Config changes are written to disk at most this often (in seconds)
+CONFIG_SAVE_INTERVAL = 0.5
+
+
+# orjson is an optional, faster drop-in for the json module
+try:
+    import orjson  # type: ignore
+
+    orjson_available = True
+except ImportError:
+    orjson_available = False
 
 
 class CustomJSONEncoder(json.JSONEncoder):
@@ -41,17 +98,61 @@ class CustomJSONEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+def _orjson_default(o: Any) -> Any:
+    if isinstance(o, RGBW):
+        return o.to_dict()
+    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any, indent: bool = False, **kwargs: Any) -> str:
+    """Serialize data as JSON, with orjson when available. Keyword arguments
+    are passed to json.dumps when it is used instead."""
+    if orjson_available:
+        option = orjson.OPT_INDENT_2 if indent else 0  # pylint: disable=no-member
+        try:
+            return orjson.dumps(  # pylint: disable=no-member
+                obj, default=_orjson_default, option=option
+            ).decode("utf-8")
+        except TypeError:
+            # Things orjson does not support (like non string keys) go through
+            # the json module instead
+            pass
+    kwargs.setdefault("cls", CustomJSONEncoder)
+    return json.dumps(obj, indent=2 if indent else None, **kwargs)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Deserialize JSON data, with orjson when available"""
+    if orjson_available:
+        return orjson.loads(data)  # pylint: disable=no-member
+    return json.loads(data)
+
+
+class SocketIOJSON:
+    """The json module interface that SocketIO expects, using json_dumps and
+    json_loads"""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        return json_dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(s: Union[str, bytes], **_kwargs: Any) -> Any:
+        return json_loads(s)
+
+
 class CustomJSONProvider(JSONProvider):
     """Custom JSON provider that uses our custom encoder for RGBW serialization"""
 
     def dumps(self, obj: Any, **kwargs: Any) -> str:
         """Serialize data as JSON using our custom encoder"""
-        kwargs.setdefault("cls", CustomJSONEncoder)
-        return json.dumps(obj, **kwargs)
+        return json_dumps(obj, **kwargs)
 
     def loads(self, s: Any, **kwargs: Any) -> Any:
         """Deserialize JSON data"""
-        return json.loads(s, **kwargs)
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return json_loads(s)
 
 
 class LEDs:
@@ -60,29 +161,64 @@ class LEDs:
         self._app.json = CustomJSONProvider(self._app)
         self.config = config
         self._debug = debug
-        self._socketio = SocketIO(self._app, cors_allowed_origins="*")
+        # The effect runs on a regular thread, so use threads for the server as
+        # well instead of picking up eventlet or gevent when they are installed
+        self._socketio = SocketIO(
+            self._app,
+            cors_allowed_origins="*",
+            async_mode="threading",
+            json=SocketIOJSON,
+            logger=False,
+            engineio_logger=False,
+        )
         # Disable Flask request logging
         log = logging.getLogger("werkzeug")
         log.setLevel(logging.ERROR)
         self._controller = get_led_controller(config, mock)
+        # The layout never changes while running, so serialize it only once
+        self._visualizer_config_json = json_dumps(
+            self._controller.get_visualizer_config()
+        )
         self._init_routes()
         self._effects = get_effects(self._controller)
         self._running = False
         self._ws_client_lock = threading.Lock()
         self._ws_client_count = 0
+        # Last frame sent to the visualizer, None forces a full frame
+        self._last_sent_frame: Optional[np.ndarray] = None
+        self._last_keyframe_time = 0.0
+        # Set by handlers outside the render loop to have its next frame sent in
+        # full, _last_sent_frame is only touched by the render loop
+        self._keyframe_requested = False
+        # (Parameter.version, current effect name) and the /effects response
+        self._effects_json_cache: Optional[Tuple[Tuple[int, str], str]] = None
+        # Whether a state_update should go out with the next frame
+        self._state_update_pending = False
 
         # FPS tracking variables
         self._frame_count = 0
-        self._last_fps_time = time.time()
+        self._last_fps_time = time.monotonic()
         self._fps = 0.0
 
         # Load all configuration from a single file
         self._config_data = self._load_config()
+        # Presets by id, _config_data["presets"] holds the same presets as a list
+        self._presets_by_id: Dict[Any, Dict[str, Any]] = {
+            preset["id"]: preset for preset in self._config_data.get("presets", [])
+        }
+        # Saving only marks the config dirty, a background thread writes it
+        self._config_lock = threading.Lock()
+        # Held while writing the file, so request handlers never wait on the disk
+        self._config_write_lock = threading.Lock()
+        self._config_dirty = threading.Event()
+        threading.Thread(target=self._config_writer, daemon=True).start()
+        atexit.register(self._flush_pending_config)
         startup_power = self._effective_power_on_at_startup()
         self._power_state = startup_power
         self._brightness = self._config_data.get("brightness", 1.0)
         self._active_preset_id = self._config_data.get("active_preset_id", None)
-        self._fade_start_time = 0
+        # In time.monotonic() ms like the render loop, -inf means no fade yet
+        self._fade_start_time = float("-inf")
         self._fade_duration = 300  # ms
         self._target_power_state = startup_power
 
@@ -109,9 +245,7 @@ class LEDs:
 
         self._effect = self._effects[effect_name]
         if "parameters" in data and data["parameters"] is not None:
-            for param_name, param_value in data["parameters"].items():
-                if hasattr(self._effect.PARAMETERS, param_name):
-                    getattr(self._effect.PARAMETERS, param_name).set_value(param_value)
+            self._effect.set_parameter_values(data["parameters"])
 
         if "brightness" in data and data["brightness"] is not None:
             self._brightness = float(data["brightness"])
@@ -129,10 +263,10 @@ class LEDs:
         default_id: Optional[int] = self._config_data.get("default_preset_id")
         if default_id is None:
             return
-        presets = self._config_data.get("presets", [])
-        preset = next((p for p in presets if p["id"] == default_id), None)
+        preset = self._presets_by_id.get(default_id)
         if preset is None:
-            self._config_data["default_preset_id"] = None
+            with self._config_lock:
+                self._config_data["default_preset_id"] = None
             self._save_config()
             return
         ok = self._apply_preset_payload(
@@ -144,7 +278,8 @@ class LEDs:
             }
         )
         if not ok:
-            self._config_data["default_preset_id"] = None
+            with self._config_lock:
+                self._config_data["default_preset_id"] = None
             self._save_config()
 
     def _get_sleep_time(self) -> float:
@@ -157,16 +292,39 @@ class LEDs:
         return Path.home() / ".led_config.json"
 
     def _save_config(self) -> None:
-        """Save the current configuration to disk"""
-        save_path = self._get_config_path()
-        # Update the config data with current state
-        self._config_data["power_state"] = self._power_state
-        self._config_data["effect_name"] = self._effect.__class__.__name__
-        self._config_data["brightness"] = self._brightness
-        self._config_data["active_preset_id"] = self._active_preset_id
-        # Save entire config including presets
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(self._config_data, f, indent=2)
+        """Update the configuration with the current state and schedule it to be
+        written to disk, see _config_writer"""
+        with self._config_lock:
+            self._config_data["power_state"] = self._power_state
+            self._config_data["effect_name"] = self._effect.__class__.__name__
+            self._config_data["brightness"] = self._brightness
+            self._config_data["active_preset_id"] = self._active_preset_id
+        self._config_dirty.set()
+
+    def _config_writer(self) -> None:
+        """Writes the configuration whenever it is saved, at most once every
+        CONFIG_SAVE_INTERVAL so rapid changes (like dragging a slider) result in
+        a single write"""
+        while True:
+            self._config_dirty.wait()
+            self._flush_pending_config()
+            time.sleep(CONFIG_SAVE_INTERVAL)
+
+    def _flush_pending_config(self) -> None:
+        """Write the configuration to disk if it changed since the last write"""
+        with self._config_write_lock:
+            with self._config_lock:
+                if not self._config_dirty.is_set():
+                    return
+                self._config_dirty.clear()
+                # Save entire config including presets. Everything that changes
+                # _config_data holds the lock, so this is a consistent snapshot
+                serialized = json_dumps(self._config_data, indent=True)
+            save_path = self._get_config_path()
+            temp_path = save_path.with_suffix(".tmp")
+            temp_path.write_text(serialized, encoding="utf-8")
+            # Replace in one step so a crash never leaves a half written config
+            os.replace(temp_path, save_path)
 
     def _load_config(self) -> Dict[str, Any]:
         """Load the configuration from disk"""
@@ -174,9 +332,8 @@ class LEDs:
         if not save_path.exists():
             return {"power_state": True}  # Default configuration
         try:
-            with open(save_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, KeyError):
+            return json_loads(save_path.read_bytes())
+        except (ValueError, KeyError):
             return {"power_state": True}
 
     def _has_ws_clients(self) -> bool:
@@ -195,6 +352,56 @@ class LEDs:
                 "WebSocket emit failed for %s", event, exc_info=True
             )
 
+    def _emit_led_update(self, frame_time: float) -> None:
+        """Send the LED colors to the visualizer. Sends a full led_update frame
+        (see ControllerBase.packed_frame) every KEYFRAME_INTERVAL or when most
+        LEDs changed, otherwise a led_delta frame with the same header followed
+        by the number of changed LEDs, their indices and their colors. Nothing is
+        sent for frames that are identical to the previous one."""
+        if self.config.debug_positions:
+            self._safe_emit("led_update", self._controller.json())
+            return
+
+        keyframe_requested = self._keyframe_requested
+        if keyframe_requested:
+            self._keyframe_requested = False
+        frame = self._controller.packed_frame()
+        last_frame = self._last_sent_frame
+        self._last_sent_frame = frame
+        if (
+            keyframe_requested
+            or last_frame is None
+            or last_frame.shape != frame.shape
+            or frame_time - self._last_keyframe_time >= KEYFRAME_INTERVAL
+        ):
+            self._last_keyframe_time = frame_time
+            self._safe_emit("led_update", frame.tobytes())
+            return
+
+        header_size = 1 + 2 * int(frame[0])
+        colors = frame[header_size:]
+        changed = np.flatnonzero(colors != last_frame[header_size:])
+        if len(changed) == 0 and np.array_equal(
+            frame[:header_size], last_frame[:header_size]
+        ):
+            # Nothing changed, the next keyframe still goes out on time
+            return
+        if len(changed) > len(colors) // 2:
+            self._last_keyframe_time = frame_time
+            self._safe_emit("led_update", frame.tobytes())
+            return
+        self._safe_emit(
+            "led_delta",
+            np.concatenate(
+                [
+                    frame[:header_size],
+                    np.array([len(changed)], dtype="<u4"),
+                    changed.astype("<u4"),
+                    colors[changed],
+                ]
+            ).tobytes(),
+        )
+
     def _emit_state_update(self) -> None:
         """Emit current state through WebSocket"""
         self._safe_emit(
@@ -209,20 +416,33 @@ class LEDs:
             },
         )
 
+    def _get_effects_payload(self) -> Dict[str, Any]:
+        """The effects, their parameters and the current effect"""
+        return {
+            "effect_parameters": get_all_effects_parameters(self._effects),
+            "effect_names": {
+                effect_name: effect.get_name()
+                for effect_name, effect in self._effects.items()
+            },
+            "current_effect": self._effect.__class__.__name__,
+        }
+
+    def _get_effects_json(self) -> str:
+        """_get_effects_payload serialized as JSON, cached until a parameter or
+        the current effect changes"""
+        key = (Parameter.version, self._effect.__class__.__name__)
+        if self._effects_json_cache is None or self._effects_json_cache[0] != key:
+            self._effects_json_cache = (key, json_dumps(self._get_effects_payload()))
+        return self._effects_json_cache[1]
+
     def _emit_effects_update(self) -> None:
         """Emit current effects through WebSocket"""
-        effect_parameters = get_all_effects_parameters(self._effects)
-        self._safe_emit(
-            "effects_update",
-            {
-                "effect_parameters": effect_parameters,
-                "effect_names": {
-                    effect_name: effect.get_name()
-                    for effect_name, effect in self._effects.items()
-                },
-                "current_effect": self._effect.__class__.__name__,
-            },
-        )
+        self._safe_emit("effects_update", self._get_effects_payload())
+
+    def _store_presets(self) -> None:
+        """Update the presets in the configuration after changing _presets_by_id,
+        call with _config_lock held"""
+        self._config_data["presets"] = list(self._presets_by_id.values())
 
     def _emit_presets_update(self) -> None:
         """Emit current presets through WebSocket"""
@@ -230,29 +450,38 @@ class LEDs:
         self._safe_emit("presets_update", presets)
 
     def _init_routes(self) -> None:
+        # On the strips the page and the static files do not change while
+        # running, so render and read them once. Mock and debug runs are used
+        # for development (see main.py dev) and read them on every request.
+        cache_files = not (self._controller.is_mock or self._debug)
+        self._app.config["TEMPLATES_AUTO_RELOAD"] = not cache_files
+        visualizer_html: Optional[str] = None
+        if cache_files:
+            with self._app.app_context():
+                visualizer_html = render_template("visualizer.html")
+        static_files_cache = _read_static_files() if cache_files else {}
+
         @self._app.route("/")
         def home():  # type: ignore  # pylint: disable=unused-variable
+            if visualizer_html is not None:
+                return visualizer_html
             return render_template("visualizer.html")
 
         @self._app.route("/static/<path:filename>")
         def static_files(filename: str):  # type: ignore  # pylint: disable=unused-variable
-            static_dir = os.path.join(os.path.dirname(__file__), "static")
-            response = send_from_directory(static_dir, filename)
-
-            # Set correct MIME types for common web files
-            if filename.endswith(".js"):
-                response.headers["Content-Type"] = "application/javascript"
-            elif filename.endswith(".css"):
-                response.headers["Content-Type"] = "text/css"
-            elif filename.endswith(".html"):
-                response.headers["Content-Type"] = "text/html"
-            elif filename.endswith(".json"):
-                response.headers["Content-Type"] = "application/json"
-            elif filename.endswith(".svg"):
-                response.headers["Content-Type"] = "image/svg+xml"
-            # For other file types, the default MIME type from send_from_directory is used
-
-            return response
+            if cache_files:
+                static_file = static_files_cache.get(filename)
+            else:
+                static_file = _read_static_file(filename)
+            if static_file is None:
+                abort(404)
+            body, mimetype, etag = static_file
+            response = Response(body, mimetype=mimetype)
+            response.set_etag(etag)
+            # The files are not versioned, so have browsers revalidate them. An
+            # unchanged file then costs a 304 instead of the whole file.
+            response.headers["Cache-Control"] = "no-cache"
+            return response.make_conditional(request)
 
         @self._app.route("/presets", methods=["GET"])
         def get_presets():  # type: ignore  # pylint: disable=unused-variable
@@ -265,7 +494,6 @@ class LEDs:
             if not data or "name" not in data:
                 return jsonify({"error": "Invalid preset data"}), 400
 
-            presets = self._config_data.get("presets", [])
             preset = {
                 "id": data.get("id", int(time.time() * 1000)),
                 "name": data["name"],
@@ -274,26 +502,21 @@ class LEDs:
                 "parameters": data["parameters"],
             }
 
-            # Update existing preset or add new one
-            existing_index = next(
-                (i for i, p in enumerate(presets) if p["id"] == preset["id"]), -1
-            )
-            if existing_index >= 0:
-                presets[existing_index] = preset
-            else:
-                presets.append(preset)
-
-            self._config_data["presets"] = presets
+            # Update existing preset (keeping its position) or add new one
+            with self._config_lock:
+                self._presets_by_id[preset["id"]] = preset
+                self._store_presets()
             self._save_config()
             self._emit_presets_update()
             return jsonify(preset)
 
         @self._app.route("/presets/<int:preset_id>", methods=["DELETE"])
         def delete_preset(preset_id: int):  # type: ignore  # pylint: disable=unused-variable
-            presets = self._config_data.get("presets", [])
-            self._config_data["presets"] = [p for p in presets if p["id"] != preset_id]
-            if self._config_data.get("default_preset_id") == preset_id:
-                self._config_data["default_preset_id"] = None
+            with self._config_lock:
+                self._presets_by_id.pop(preset_id, None)
+                self._store_presets()
+                if self._config_data.get("default_preset_id") == preset_id:
+                    self._config_data["default_preset_id"] = None
             self._save_config()
             self._emit_presets_update()
             self._emit_state_update()
@@ -314,16 +537,19 @@ class LEDs:
 
             preset_id = data["id"]
             if preset_id is None:
-                self._config_data["default_preset_id"] = None
+                with self._config_lock:
+                    self._config_data["default_preset_id"] = None
                 self._save_config()
                 self._emit_state_update()
                 return jsonify({"success": True, "default_preset_id": None})
 
-            presets = self._config_data.get("presets", [])
-            if not any(p["id"] == preset_id for p in presets):
+            with self._config_lock:
+                found = preset_id in self._presets_by_id
+                if found:
+                    self._config_data["default_preset_id"] = preset_id
+            if not found:
                 return jsonify({"error": "Preset not found"}), 404
 
-            self._config_data["default_preset_id"] = preset_id
             self._save_config()
             self._emit_state_update()
             return jsonify({"success": True, "default_preset_id": preset_id})
@@ -340,16 +566,8 @@ class LEDs:
 
         @self._app.route("/effects")
         def get_effects_route():  # type: ignore  # pylint: disable=unused-variable
-            effect_parameters = get_all_effects_parameters(self._effects)
-            return jsonify(
-                {
-                    "effect_parameters": effect_parameters,
-                    "effect_names": {
-                        effect_name: effect.get_name()
-                        for effect_name, effect in self._effects.items()
-                    },
-                    "current_effect": self._effect.__class__.__name__,
-                }
+            return self._app.response_class(
+                self._get_effects_json(), mimetype="application/json"
             )
 
         @self._app.route("/effects", methods=["POST"])
@@ -373,11 +591,7 @@ class LEDs:
             self._effect = self._effects[effect_name]
             # Set parameters if provided
             if "parameters" in data:
-                for param_name, param_value in data["parameters"].items():
-                    if hasattr(self._effect.PARAMETERS, param_name):
-                        getattr(self._effect.PARAMETERS, param_name).set_value(
-                            param_value
-                        )
+                self._effect.set_parameter_values(data["parameters"])
 
             # Clear active preset since values were modified
             self._active_preset_id = None
@@ -390,7 +604,9 @@ class LEDs:
 
         @self._app.route("/config")
         def get_visualizer_config():  # type: ignore  # pylint: disable=unused-variable
-            return jsonify(self._controller.get_visualizer_config())
+            return self._app.response_class(
+                self._visualizer_config_json, mimetype="application/json"
+            )
 
         @self._app.route("/state", methods=["POST"])
         def set_state():  # type: ignore  # pylint: disable=unused-variable
@@ -405,13 +621,14 @@ class LEDs:
                         ),
                         400,
                     )
-                self._config_data["power_on_at_startup"] = val
+                with self._config_lock:
+                    self._config_data["power_on_at_startup"] = val
 
             # Handle power state
             if "power_state" in data:
                 target_state: bool = data.get("power_state", False)
                 self._target_power_state = target_state
-                self._fade_start_time = time.time() * 1000  # Convert to ms
+                self._fade_start_time = time.monotonic() * 1000  # Convert to ms
 
             # Handle brightness
             if "brightness" in data:
@@ -421,7 +638,9 @@ class LEDs:
                 self._active_preset_id = None
 
             self._save_config()
-            self._emit_state_update()
+            # Sliders post many times per second, the render loop sends a single
+            # state_update with the latest state instead of one per request
+            self._state_update_pending = True
             return jsonify(
                 {
                     "success": True,
@@ -452,6 +671,8 @@ class LEDs:
             """Emit full state when a client connects"""
             with self._ws_client_lock:
                 self._ws_client_count += 1
+            # The new client needs a full frame before deltas mean anything
+            self._keyframe_requested = True
             self._emit_state_update()
             self._emit_effects_update()
             self._emit_presets_update()
@@ -484,23 +705,33 @@ class LEDs:
         return self._effect
 
     def start(self) -> None:
-        """Start the LED effect in a background thread"""
+        """Start the LED effect as a background task of the socket.io server,
+        so it follows whatever async mode the server runs in"""
 
         def run_effect() -> None:
-            now = time.time()
+            now = time.monotonic()
+            # Whether the strips are mocked never changes while running
+            sleep_time = self._get_sleep_time()
+            # Frames start every sleep_time, however long rendering them took
+            next_frame = now
+            strips_cleared = False
             while self._running:
-                elapsed_ms = int((time.time() - now) * 1000)
+                # Read the clock once per frame, everything below uses this time.
+                # Monotonic, so effects do not jump when the system clock is set
+                frame_time = time.monotonic()
+                elapsed_ms = int((frame_time - now) * 1000)
 
                 # Calculate fade progress
                 fade_progress = min(
                     1.0,
-                    (time.time() * 1000 - self._fade_start_time) / self._fade_duration,
+                    (frame_time * 1000 - self._fade_start_time) / self._fade_duration,
                 )
 
                 if fade_progress >= 1.0:
                     self._power_state = self._target_power_state
 
                 if self._power_state or fade_progress < 1.0:
+                    strips_cleared = False
                     self._effect.run(elapsed_ms)
                     if fade_progress < 1.0:
                         # Apply fade effect
@@ -513,31 +744,40 @@ class LEDs:
                         self._controller.set_brightness(brightness * self._brightness)
                     else:
                         self._controller.set_brightness(self._brightness)
-                else:
-                    self._controller.set_color(RGBW(0, 0, 0, 0))
+                elif not strips_cleared:
+                    # Nothing changes while off, so only clear the strips once
+                    self._controller.clear()
                     self._controller.show()
+                    strips_cleared = True
 
                 # Emit LED data through WebSocket (skip when no visualizer is open)
                 if self._has_ws_clients():
-                    self._safe_emit("led_update", self._controller.json())
+                    self._emit_led_update(frame_time)
+                if self._state_update_pending:
+                    self._state_update_pending = False
+                    self._emit_state_update()
 
                 # FPS tracking and debug output
                 if self._debug:
                     self._frame_count += 1
-                    current_time = time.time()
-                    time_diff = current_time - self._last_fps_time
+                    time_diff = frame_time - self._last_fps_time
 
                     # Print FPS every 1 second
                     if time_diff >= 1.0:
                         self._fps = self._frame_count / time_diff
                         print(f"FPS: {self._fps:.2f}", flush=True)
                         self._frame_count = 0
-                        self._last_fps_time = current_time
+                        self._last_fps_time = frame_time
 
-                time.sleep(self._get_sleep_time())
+                next_frame += sleep_time
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    self._socketio.sleep(delay)
+                else:
+                    # Running behind, start over instead of rushing to catch up
+                    next_frame = time.monotonic()
 
-        effect_thread = threading.Thread(target=run_effect, daemon=True)
-        effect_thread.start()
+        self._socketio.start_background_task(run_effect)
 
 
 def main() -> None:
@@ -566,7 +806,7 @@ def main() -> None:
         sys.exit(1)
 
     leds = LEDs(mock, get_config(mode), debug)
-    leds.start()  # Start effect thread
+    leds.start()  # Start the effect loop
     leds.listen()  # Run Flask in main thread
 
 
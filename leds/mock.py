@@ -1,4 +1,5 @@
-from typing import List, Any
+from typing import Any
+import numpy as np
 from leds.color import RGBW
 
 
@@ -7,15 +8,16 @@ class MockPixelStrip:
         self, num: int, brightness: int = 255, **kwargs: Any
     ):  # pylint: disable=unused-argument
         self.num_pixels = num
-        self._pixels: List[RGBW] = [RGBW(0, 0, 0, 0) for _ in range(num)]
-        self._buffer: List[RGBW] = [RGBW(0, 0, 0, 0) for _ in range(num)]
+        # Packed 0xWWRRGGBB colors, see RGBW.pack
+        self._pixels = np.zeros(num, dtype=np.uint32)
+        self._buffer = np.zeros(num, dtype=np.uint32)
         self._brightness = brightness
 
     def __getitem__(self, pos: int) -> RGBW:
-        return self._pixels[pos]
+        return RGBW(int(self._pixels[pos]))
 
     def __setitem__(self, pos: int, value: RGBW):
-        self._buffer[pos] = value
+        self._buffer[pos] = int(value)
 
     def __len__(self):
         return self.num_pixels
@@ -30,11 +32,19 @@ class MockPixelStrip:
         pass
 
     def show(self):
-        # Swap buffer with pixels
-        self._pixels = self._buffer.copy()
+        # Copy the buffer into the shown pixels without allocating a new array
+        np.copyto(self._pixels, self._buffer)
 
     def setPixelColor(self, n: int, color: RGBW):
-        self._buffer[n] = color
+        self._buffer[n] = int(color)
+
+    def setPixelColorArray(self, colors: np.ndarray):
+        """Sets the colors of all pixels at once from an array of packed colors.
+        Entries masked out with numpy.ma keep their current color."""
+        if np.ma.is_masked(colors):
+            np.copyto(self._buffer, colors.data, where=~colors.mask)
+        else:
+            self._buffer[:] = colors
 
     def setPixelColorRGB(
         self, n: int, red: int, green: int, blue: int, white: int = 0
@@ -54,12 +64,10 @@ class MockPixelStrip:
         return len(self)
 
     def getPixelColor(self, n: int) -> int:
-        return self._pixels[n]
+        return int(self._pixels[n])
 
     def getPixelColorRGB(self, n: int) -> RGBW:
-        pixel = self._pixels[n]
-        return RGBW(pixel.r, pixel.g, pixel.b, pixel.w)
+        return RGBW(int(self._pixels[n]))
 
     def getPixelColorRGBW(self, n: int) -> RGBW:
-        pixel = self._pixels[n]
-        return RGBW(pixel.r, pixel.g, pixel.b, pixel.w)
+        return RGBW(int(self._pixels[n]))
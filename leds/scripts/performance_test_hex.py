@@ -2,6 +2,7 @@ import sys
 import time
 import argparse
 from pathlib import Path
+import numpy as np
 
 # Add parent directories to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -39,26 +40,31 @@ def main():
     )
     strip.begin()
 
-    def wheel(pos: int) -> RGBW:
-        """Generate rainbow colors across 0-255 positions."""
-        if pos < 85:
-            return RGBW(pos * 3, 255 - pos * 3, 0, 0)
-        elif pos < 170:
-            pos -= 85
-            return RGBW(255 - pos * 3, 0, pos * 3, 0)
-        else:
-            pos -= 170
-            return RGBW(0, pos * 3, 255 - pos * 3, 0)
+    def wheel(positions: np.ndarray) -> np.ndarray:
+        """Generate packed rainbow colors across 0-255 positions."""
+        first = positions < 85
+        second = ~first & (positions < 170)
+        third = positions >= 170
+        # Position within the current third of the wheel
+        pos = positions - np.select([second, third], [85, 170], 0)
+        return RGBW.pack_array(
+            np.select([first, second], [pos * 3, 255 - pos * 3], 0),
+            np.select([first, third], [255 - pos * 3, pos * 3], 0),
+            np.select([second, third], [pos * 3, 255 - pos * 3], 0),
+        )
 
     def rainbow_cycle(wait: float) -> None:
         """Draw rainbow that uniformly distributes itself across all pixels."""
         frame_count = 0
         start_time = time.time()
+        led_count = config.get_led_count()
+        # The wheel only has 256 colors, so compute them once
+        wheel_lut = wheel(np.arange(256))
+        # Wheel position of every pixel, before shifting
+        positions = np.arange(led_count) * 256 // led_count
         while True:
             for j in range(256):
-                for i in range(config.get_led_count()):
-                    pixel_index = (i * 256 // config.get_led_count()) + j
-                    strip.setPixelColor(i, wheel(pixel_index & 255))
+                strip.setPixelColorArray(wheel_lut[(positions + j) & 255])
                 strip.show()
                 time.sleep(wait)
                 frame_count += 1
@@ -72,8 +78,7 @@ def main():
         rainbow_cycle(0.001)  # Adjust the speed of the animation here
     except KeyboardInterrupt:
         # Turn off all LEDs on exit
-        for i in range(config.get_led_count()):
-            strip.setPixelColor(i, RGBW(0, 0, 0, 0))
+        strip.setPixelColorArray(np.zeros(config.get_led_count(), dtype=np.uint32))
         strip.show()
 
 
@@ -3,6 +3,7 @@ import time
 import argparse
 from pathlib import Path
 from typing import List, Tuple
+import numpy as np
 
 # Add parent directories to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -50,29 +51,36 @@ def main():
             print(f"Error parsing config '{config_str}': {e}")
             sys.exit(1)
 
-    def wheel(pos: int) -> RGBW:
-        """Generate rainbow colors across 0-255 positions."""
-        if pos < 85:
-            return RGBW(pos * 3, 255 - pos * 3, 0, 0)
-        elif pos < 170:
-            pos -= 85
-            return RGBW(255 - pos * 3, 0, pos * 3, 0)
-        else:
-            pos -= 170
-            return RGBW(0, pos * 3, 255 - pos * 3, 0)
+    def wheel(positions: np.ndarray) -> np.ndarray:
+        """Generate packed rainbow colors across 0-255 positions."""
+        first = positions < 85
+        second = ~first & (positions < 170)
+        third = positions >= 170
+        # Position within the current third of the wheel
+        pos = positions - np.select([second, third], [85, 170], 0)
+        return RGBW.pack_array(
+            np.select([first, second], [pos * 3, 255 - pos * 3], 0),
+            np.select([first, third], [255 - pos * 3, pos * 3], 0),
+            np.select([second, third], [pos * 3, 255 - pos * 3], 0),
+        )
 
     def rainbow_cycle(wait: float) -> None:
         """Draw rainbow that uniformly distributes itself across all strips."""
         frame_count = 0
         start_time = time.time()
 
+        # The wheel only has 256 colors, so compute them once
+        wheel_lut = wheel(np.arange(256))
+        # Wheel position of every pixel of every strip, before shifting
+        strip_positions = [
+            np.arange(pin_count) * 256 // pin_count for _, pin_count in strips
+        ]
+
         while True:
             for j in range(256):
                 # Update all strips in parallel
-                for strip, pin_count in strips:
-                    for i in range(pin_count):
-                        pixel_index = (i * 256 // pin_count) + j
-                        strip.setPixelColor(i, wheel(pixel_index & 255))
+                for (strip, _), positions in zip(strips, strip_positions):
+                    strip.setPixelColorArray(wheel_lut[(positions + j) & 255])
 
                 # Show all strips
                 for strip, _ in strips:
@@ -93,8 +101,7 @@ def main():
     except KeyboardInterrupt:
         # Turn off all LEDs on exit
         for strip, pin_count in strips:
-            for i in range(pin_count):
-                strip.setPixelColor(i, RGBW(0, 0, 0, 0))
+            strip.setPixelColorArray(np.zeros(pin_count, dtype=np.uint32))
             strip.show()
 
 
@@ -24,6 +24,12 @@ export class LEDVisualizerBase {
         /** @type {WebSocket} */
         this.socket = null;
 
+        /**
+         * Colors of all LEDs in the last frame, led_delta frames update these
+         * @type {Uint32Array | null}
+         */
+        this.lastColors = null;
+
         // Bind methods to this instance
         this.calculateScale = this.calculateScale.bind(this);
         this.updateCanvasSize = this.updateCanvasSize.bind(this);
@@ -120,10 +126,20 @@ export class LEDVisualizerBase {
                 this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
                 const scale = this.calculateScale();
                 /** @type {LED[][]} */
-                const typedData = data;
+                const typedData =
+                    data instanceof ArrayBuffer ? this.decodeLEDFrame(data) : data;
                 this.updateLEDsWithData(typedData, scale);
             });
 
+            this.socket.on("led_delta", (data) => {
+                const typedData = this.decodeLEDDelta(data);
+                if (!typedData) {
+                    return;
+                }
+                this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+                this.updateLEDsWithData(typedData, this.calculateScale());
+            });
+
             this.socket.on("state_update", (data) => {
                 window.dispatchEvent(
                     new CustomEvent("led-state-update", { detail: data })
@@ -156,6 +172,74 @@ export class LEDVisualizerBase {
         }
     }
 
+    /**
+     * Decodes a binary led_update frame, see ControllerBase.packed_frame
+     * @param {ArrayBuffer} buffer - The frame, little endian uint32s
+     * @returns {LED[][]} The LEDs of every strip
+     */
+    decodeLEDFrame(buffer) {
+        const view = new DataView(buffer);
+        let offset = 4 + view.getUint32(0, true) * 8;
+        this.lastColors = new Uint32Array((buffer.byteLength - offset) / 4);
+        for (let i = 0; i < this.lastColors.length; i++, offset += 4) {
+            this.lastColors[i] = view.getUint32(offset, true);
+        }
+        return this.buildLEDs(view);
+    }
+
+    /**
+     * Applies a binary led_delta frame to the colors of the last frame
+     * @param {ArrayBuffer} buffer - The header of a full frame, the number of
+     * changed LEDs, their indices and then their colors as little endian uint32s
+     * @returns {LED[][] | null} The LEDs of every strip, or null when no full
+     * frame has been received yet
+     */
+    decodeLEDDelta(buffer) {
+        if (!this.lastColors) {
+            return null;
+        }
+        const view = new DataView(buffer);
+        const countOffset = 4 + view.getUint32(0, true) * 8;
+        const changedCount = view.getUint32(countOffset, true);
+        const indexOffset = countOffset + 4;
+        const colorOffset = indexOffset + changedCount * 4;
+        for (let i = 0; i < changedCount; i++) {
+            this.lastColors[view.getUint32(indexOffset + i * 4, true)] =
+                view.getUint32(colorOffset + i * 4, true);
+        }
+        return this.buildLEDs(view);
+    }
+
+    /**
+     * Builds the LEDs of every strip from a frame header and the last colors
+     * @param {DataView} view - View of a frame, starting with its header
+     * @returns {LED[][]} The LEDs of every strip
+     */
+    buildLEDs(view) {
+        const stripCount = view.getUint32(0, true);
+        let colorIndex = 0;
+        /** @type {LED[][]} */
+        const strips = [];
+        for (let stripIndex = 0; stripIndex < stripCount; stripIndex++) {
+            const pixelCount = view.getUint32(4 + stripIndex * 8, true);
+            const brightness = view.getUint32(8 + stripIndex * 8, true);
+            /** @type {LED[]} */
+            const leds = [];
+            for (let i = 0; i < pixelCount; i++, colorIndex++) {
+                const color = this.lastColors[colorIndex];
+                leds.push({
+                    r: (color >>> 16) & 0xff,
+                    g: (color >>> 8) & 0xff,
+                    b: color & 0xff,
+                    w: color >>> 24,
+                    brightness,
+                });
+            }
+            strips.push(leds);
+        }
+        return strips;
+    }
+
     /**
      * Resizes the canvas to fit its container
      */
@@ -27,10 +27,16 @@ PACKAGE_CONFIG: Dict[str, Any] = {
         "led": [
             "pylint",
             "flask",  # Required for mock implementation
+            "numpy",  # Required for vectorized LED effects
             "watchdog",  # Required for development mode
             "Flask-SocketIO",  # Required for real-time updates
             "python-socketio",  # Required for real-time updates
             "python-engineio>=4.8.0",  # Fixes ping-timeout race on emit
+            "simple-websocket",  # WebSocket transport for threading async mode
+        ],
+        "perf": [
+            "numba",  # Optional, compiles the hottest LED effect kernels
+            "orjson",  # Optional, faster JSON for the web server and config
         ],
         "cad": [
             "pylint",